@@ -0,0 +1,179 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
+from django_filters.utils import translate_validation
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from recipes.constants import SHORT_LINK_CACHE_NAME
+from recipes.models import Recipe, User
+from recipes.utils import aget_recipe_id_by_code
+from .authentication import (
+    AsyncTokenAuthentication,
+    StatelessJWTAuthentication,
+)
+from .filters import RecipeFilter
+from .metrics import count_cache_lookup
+from .pagination import AsyncPageLimitPagination
+from .serializers import RecipeReadSerializer, SubscribeUserSerializer
+from .views import RecipeViewSet, UserViewSet
+
+recipe_queryset = Recipe.objects.select_related(
+    'author'
+).prefetch_related(
+    'tags',
+    'recipe_ingredients__ingredient',
+)
+
+
+def render_json(data, status=200, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type='application/json',
+        status=status,
+        headers=headers,
+    )
+
+
+def async_api_view(fallback_view):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await sync_to_async(fallback_view)(
+                    request, *args, **kwargs
+                )
+            authentication = AsyncTokenAuthentication()
+            try:
+                api_request = Request(request)
+                user_auth = await authentication.aauthenticate(request)
+                if user_auth is None and settings.JWT_AUTH:
+                    user_auth = StatelessJWTAuthentication().authenticate(
+                        request
+                    )
+                api_request.user = (
+                    user_auth[0] if user_auth else AnonymousUser()
+                )
+                return await view(api_request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                headers = None
+                if isinstance(exc, (
+                    exceptions.NotAuthenticated,
+                    exceptions.AuthenticationFailed,
+                )):
+                    exc.status_code = 401
+                    headers = {
+                        'WWW-Authenticate':
+                            authentication.authenticate_header(request)
+                    }
+                response = exception_handler(exc, {})
+                return render_json(
+                    response.data,
+                    status=response.status_code,
+                    headers=headers,
+                )
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+async def serialize(serializer):
+    return await sync_to_async(lambda: serializer.data)()
+
+
+def filter_recipes(request):
+    filterset = RecipeFilter(
+        request.query_params,
+        queryset=recipe_queryset.all(),
+        request=request,
+    )
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return filterset.qs
+
+
+@async_api_view(RecipeViewSet.as_view(
+    {'get': 'list', 'post': 'create'},
+    basename='recipes',
+    detail=False,
+))
+async def recipe_list(request):
+    queryset = await sync_to_async(filter_recipes)(request)
+    paginator = AsyncPageLimitPagination()
+    recipes = await paginator.apaginate_queryset(queryset, request)
+    data = await serialize(RecipeReadSerializer(
+        recipes,
+        many=True,
+        context={'request': request},
+    ))
+    return render_json(paginator.get_paginated_data(data))
+
+
+@async_api_view(RecipeViewSet.as_view(
+    {
+        'get': 'retrieve',
+        'put': 'update',
+        'patch': 'partial_update',
+        'delete': 'destroy',
+    },
+    basename='recipes',
+    detail=True,
+))
+async def recipe_detail(request, id):
+    try:
+        recipe = await recipe_queryset.aget(id=id)
+    except Recipe.DoesNotExist:
+        raise exceptions.NotFound(
+            f'No {Recipe._meta.object_name} matches the given query.'
+        )
+    return render_json(await serialize(RecipeReadSerializer(
+        recipe,
+        context={'request': request},
+    )))
+
+
+@async_api_view(UserViewSet.as_view(
+    {'get': 'subscriptions'},
+    basename='users',
+    detail=False,
+))
+async def subscriptions(request):
+    if not request.user.is_authenticated:
+        raise exceptions.NotAuthenticated
+    queryset = User.objects.filter(
+        subscribers__user=request.user
+    ).annotate(
+        recipes_count=Count('recipes')
+    ).prefetch_related(
+        'recipes'
+    ).order_by(*User._meta.ordering)
+    paginator = AsyncPageLimitPagination()
+    users = await paginator.apaginate_queryset(queryset, request)
+    data = await serialize(SubscribeUserSerializer(
+        users,
+        many=True,
+        context={
+            'request': request,
+            'recipes_limit': request.query_params.get('recipes_limit'),
+        },
+    ))
+    return render_json(paginator.get_paginated_data(data))
+
+
+async def short_link_redirect(request, code):
+    try:
+        recipe_id, hit = await aget_recipe_id_by_code(code)
+    except ValueError:
+        raise Http404
+    if hit is not None:
+        count_cache_lookup(SHORT_LINK_CACHE_NAME, hit)
+    return redirect(
+        f'https://{settings.DOMAIN}/recipes/{recipe_id}/'
+    )
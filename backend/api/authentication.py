@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import (
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from recipes.constants import (
+    AUTH_TOKEN_CACHE_NAME,
+    AUTH_TOKEN_CACHE_PREFIX,
+    JWT_USER_CLAIMS,
+)
+from recipes.models import User
+from .metrics import count_cache_lookup
+
+
+def get_token_cache_key(key):
+    return f'{AUTH_TOKEN_CACHE_PREFIX}{key}'
+
+
+def invalidate_token_cache(*keys):
+    cache.delete_many([get_token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        user = cache.get(cache_key)
+        count_cache_lookup(AUTH_TOKEN_CACHE_NAME, user is not None)
+        if user is None:
+            user, _ = super().authenticate_credentials(key)
+            cache.set(cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return user, self.get_model()(key=key, user=user)
+
+
+class AsyncTokenAuthentication(CachedTokenAuthentication):
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. No credentials provided.')
+            )
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain '
+                  'invalid characters.')
+            )
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        model = self.get_model()
+        cache_key = get_token_cache_key(key)
+        user = await cache.aget(cache_key)
+        count_cache_lookup(AUTH_TOKEN_CACHE_NAME, user is not None)
+        if user is None:
+            try:
+                token = await model.objects.select_related('user').aget(
+                    key=key
+                )
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _('User inactive or deleted.')
+                )
+            user = token.user
+            await cache.aset(
+                cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+        return user, model(key=key, user=user)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+
+    def get_user(self, validated_token):
+        if any(
+            claim not in validated_token
+            for claim in (jwt_settings.USER_ID_CLAIM, *JWT_USER_CLAIMS)
+        ):
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        values = {
+            name: validated_token[name] for name in JWT_USER_CLAIMS
+        }
+        values[jwt_settings.USER_ID_FIELD] = (
+            validated_token[jwt_settings.USER_ID_CLAIM]
+        )
+        field_names = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in values
+        ]
+        return User.from_db(
+            'default',
+            field_names,
+            [values[name] for name in field_names],
+        )
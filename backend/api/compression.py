@@ -0,0 +1,102 @@
+import gzip
+import re
+
+import brotli
+from django.conf import settings
+from django.http import HttpResponse
+
+from recipes.constants import (
+    COMPRESSIBLE_CONTENT_TYPES,
+    COMPRESSION_BROTLI_MAX_QUALITY,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_GZIP_MAX_LEVEL,
+    RESPONSE_CACHE_HEADERS,
+)
+
+
+def compress(encoding, content, best=False):
+    if encoding == 'br':
+        return brotli.compress(
+            content,
+            quality=(
+                COMPRESSION_BROTLI_MAX_QUALITY
+                if best else settings.COMPRESSION_BROTLI_QUALITY
+            ),
+        )
+    return gzip.compress(
+        content,
+        compresslevel=(
+            COMPRESSION_GZIP_MAX_LEVEL
+            if best else settings.COMPRESSION_GZIP_LEVEL
+        ),
+        mtime=0,
+    )
+
+
+def get_accepted_encodings(request):
+    encodings = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, *params = part.strip().lower().split(';')
+        try:
+            if any(
+                float(param.strip()[2:]) == 0
+                for param in params if param.strip().startswith('q=')
+            ):
+                continue
+        except ValueError:
+            continue
+        encodings.add(encoding.strip())
+    return encodings
+
+
+def negotiate_encoding(request):
+    accepted = get_accepted_encodings(request)
+    for encoding in COMPRESSION_ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+
+def is_compressible(response):
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and response.get('Content-Type', '').startswith(
+            COMPRESSIBLE_CONTENT_TYPES
+        )
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+def set_encoded_content(response, encoding, content):
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    if response.has_header('ETag'):
+        response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+    return response
+
+
+def build_compressed_variants(response):
+    content = response.content
+    variants = {None: content}
+    if is_compressible(response):
+        for encoding in COMPRESSION_ENCODINGS:
+            compressed = compress(encoding, content, best=True)
+            if len(compressed) < len(content):
+                variants[encoding] = compressed
+    return {
+        'headers': {
+            name: response[name]
+            for name in RESPONSE_CACHE_HEADERS if response.has_header(name)
+        },
+        'variants': variants,
+    }
+
+
+def get_variant_response(entry, encoding):
+    variants = entry['variants']
+    response = HttpResponse(variants[None], headers=entry['headers'])
+    if encoding in variants:
+        set_encoded_content(response, encoding, variants[encoding])
+    return response
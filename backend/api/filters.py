@@ -1,13 +1,25 @@
 from django_filters import rest_framework as filter
 from rest_framework import filters
 
+from recipes.constants import (
+    INGREDIENT_MATCH_ALL,
+    INGREDIENT_MATCH_CHOICES,
+    RECIPE_ORDERING_CHOICES,
+    RECIPE_ORDERING_FIELDS,
+)
+from recipes.ingredient_index import ingredient_index
 from recipes.models import Recipe, Tag
+from recipes.utils import filter_recipe_ids, search_recipes
 
 
 class NameSearchFilter(filters.SearchFilter):
     search_param = 'name'
 
 
+class NumberInFilter(filter.BaseInFilter, filter.NumberFilter):
+    pass
+
+
 class RecipeFilter(filter.FilterSet):
     tags = filter.ModelMultipleChoiceFilter(
         field_name='tags__slug',
@@ -19,6 +31,16 @@ class RecipeFilter(filter.FilterSet):
     is_in_shopping_cart = filter.NumberFilter(
         method='filter_is_in_shopping_cart'
     )
+    q = filter.CharFilter(method='filter_search')
+    ingredients = NumberInFilter(method='filter_ingredients')
+    match = filter.ChoiceFilter(
+        choices=INGREDIENT_MATCH_CHOICES,
+        method='filter_match',
+    )
+    ordering = filter.ChoiceFilter(
+        choices=RECIPE_ORDERING_CHOICES,
+        method='filter_ordering',
+    )
 
     class Meta:
         model = Recipe
@@ -55,6 +77,26 @@ class RecipeFilter(filter.FilterSet):
         )
         return queryset.filter(id__in=in_shopping_cart_recipe_ids)
 
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def filter_ingredients(self, queryset, name, value):
+        if not value:
+            return queryset
+        recipe_ids = ingredient_index.match(
+            map(int, value),
+            self.form.cleaned_data.get('match') or INGREDIENT_MATCH_ALL,
+        )
+        return filter_recipe_ids(queryset, recipe_ids)
+
+    def filter_match(self, queryset, name, value):
+        return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.filter(ranking__isnull=False).order_by(
+            f'-{RECIPE_ORDERING_FIELDS[value]}', '-id'
+        )
+
 
 def get_is_in_special_list(object, user, model, is_recipe):
     if is_recipe:
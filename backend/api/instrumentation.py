@@ -0,0 +1,149 @@
+import re
+import traceback
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+SQL_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+INSTRUMENTATION_MODULES = ('api/instrumentation.py', 'api/middleware.py')
+N_PLUS_ONE_ORIGIN_FRAMES = 3
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def wrap_connections(stack, wrapper):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+class QueryTimer:
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.queries += 1
+
+
+def get_query_origin():
+    base_dir = str(settings.BASE_DIR)
+    origin = [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in reversed(traceback.extract_stack())
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(INSTRUMENTATION_MODULES)
+    ]
+    return origin[:N_PLUS_ONE_ORIGIN_FRAMES]
+
+
+class QueryShapeCounter:
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.stack = ExitStack()
+        self.counts = {}
+        self.repeated = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = SQL_IN_LIST.sub('IN (...)', sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        if count == self.threshold:
+            self.repeated[shape] = get_query_origin()
+        return execute(sql, params, many, context)
+
+    def wrap_connections(self):
+        wrap_connections(self.stack, self)
+
+    def report(self):
+        return [
+            {
+                'sql': shape,
+                'count': self.counts[shape],
+                'origin': origin,
+            }
+            for shape, origin in self.repeated.items()
+        ]
+
+
+class RequestTiming:
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.stack = ExitStack()
+        self.queries = QueryTimer()
+        self.view_started = None
+        self.view_duration = None
+        self.view_db_duration = 0.0
+        self.render_started = None
+        self.render_duration = None
+        self.duration = None
+
+    def wrap_connections(self):
+        wrap_connections(self.stack, self.queries)
+
+    def start_view(self):
+        self.view_started = perf_counter()
+        self.view_db_duration = self.queries.duration
+
+    def finish_view(self):
+        if self.view_started is None or self.view_duration is not None:
+            return
+        self.view_duration = perf_counter() - self.view_started
+        self.view_db_duration = self.queries.duration - self.view_db_duration
+
+    def start_render(self, response):
+        self.finish_view()
+        self.render_started = perf_counter()
+        response.add_post_render_callback(self.finish_render)
+
+    def finish_render(self, response):
+        self.render_duration = perf_counter() - self.render_started
+
+    def finish(self):
+        self.finish_view()
+        self.duration = perf_counter() - self.started
+
+    @property
+    def serialize_duration(self):
+        if self.view_duration is None:
+            return None
+        return max(self.view_duration - self.view_db_duration, 0.0)
+
+    def as_dict(self):
+        return {
+            'total_ms': to_ms(self.duration),
+            'db_ms': to_ms(self.queries.duration),
+            'queries': self.queries.queries,
+            'serialize_ms': to_ms(self.serialize_duration),
+            'render_ms': to_ms(self.render_duration),
+        }
+
+    def server_timing(self):
+        metrics = [
+            f'db;dur={to_ms(self.queries.duration)};'
+            f'desc="{self.queries.queries} queries"'
+        ]
+        if self.serialize_duration is not None:
+            metrics.append(f'serialize;dur={to_ms(self.serialize_duration)}')
+        if self.render_duration is not None:
+            metrics.append(f'render;dur={to_ms(self.render_duration)}')
+        metrics.append(f'total;dur={to_ms(self.duration)}')
+        return ', '.join(metrics)
+
+
+def to_ms(seconds):
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 2)
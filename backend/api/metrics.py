@@ -0,0 +1,72 @@
+import os
+from ipaddress import ip_address
+
+from django.conf import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'foodgram_http_request_duration_seconds',
+    'Время обработки запроса',
+    ('route', 'method', 'status'),
+    buckets=(
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    ),
+)
+REQUEST_QUERIES = Histogram(
+    'foodgram_http_request_db_queries',
+    'Число запросов к базе за один HTTP-запрос',
+    ('route',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_http_response_size_bytes',
+    'Размер тела ответа',
+    ('route',),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'foodgram_http_requests_in_progress',
+    'Запросы в обработке',
+    multiprocess_mode='livesum',
+)
+WORKERS = Gauge(
+    'foodgram_workers',
+    'Живые процессы-воркеры',
+    multiprocess_mode='livesum',
+)
+CACHE_REQUESTS = Counter(
+    'foodgram_cache_requests_total',
+    'Обращения к кэшам',
+    ('cache', 'result'),
+)
+
+
+def count_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def is_internal_address(address):
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in network for network in settings.METRICS_ALLOWED_NETWORKS
+    )
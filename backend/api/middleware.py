@@ -0,0 +1,369 @@
+import json
+import logging
+import random
+from contextlib import contextmanager
+from time import perf_counter
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+
+from backend.db_routers import current_replica, get_replicas, use_primary
+from recipes.constants import (
+    ADMIN_URL_PREFIX,
+    METRICS_HTTP_METHODS,
+    METRICS_OTHER_METHOD,
+    PRIMARY_DATABASE_PIN_COOKIE,
+    REQUEST_TIMING_ATTRIBUTE,
+    SHORT_LINK_URL_NAME,
+    SHORT_LINK_URL_PREFIX,
+)
+from .compression import (
+    compress,
+    is_compressible,
+    negotiate_encoding,
+    set_encoded_content,
+)
+from .instrumentation import NPlusOneError, QueryShapeCounter, RequestTiming
+from .metrics import (
+    REQUEST_LATENCY,
+    REQUEST_QUERIES,
+    REQUESTS_IN_PROGRESS,
+    RESPONSE_SIZE,
+)
+
+timing_logger = logging.getLogger('api.timing')
+n_plus_one_logger = logging.getLogger('api.n_plus_one')
+
+
+class ShortLinkRedirectMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_short_link_match(self, request):
+        if not request.path_info.startswith(SHORT_LINK_URL_PREFIX):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.url_name != SHORT_LINK_URL_NAME:
+            return None
+        request.resolver_match = match
+        return match
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        match = self.get_short_link_match(request)
+        if match is None:
+            return self.get_response(request)
+        return match.func(request, *match.args, **match.kwargs)
+
+    async def __acall__(self, request):
+        match = self.get_short_link_match(request)
+        if match is None:
+            return await self.get_response(request)
+        view = match.func
+        if not iscoroutinefunction(view):
+            view = sync_to_async(view)
+        return await view(request, *match.args, **match.kwargs)
+
+
+class PrimaryDatabasePinMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.replicas = get_replicas()
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_pinned(self, request):
+        return (
+            request.method not in SAFE_METHODS
+            or PRIMARY_DATABASE_PIN_COOKIE in request.COOKIES
+        )
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                PRIMARY_DATABASE_PIN_COOKIE,
+                '1',
+                max_age=settings.DB_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    @contextmanager
+    def route_reads(self, request):
+        primary_token = use_primary.set(self.is_pinned(request))
+        replica_token = current_replica.set(random.choice(self.replicas))
+        try:
+            yield
+        finally:
+            current_replica.reset(replica_token)
+            use_primary.reset(primary_token)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.route_reads(request):
+            return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        with self.route_reads(request):
+            return self.pin(request, await self.get_response(request))
+
+
+class AdminMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.ADMIN_MIDDLEWARE):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_view'):
+                self.view_middleware.insert(0, middleware.process_view)
+            handler = middleware
+        self.admin_handler = handler
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_admin(self, request):
+        return request.path_info.startswith(ADMIN_URL_PREFIX)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.is_admin(request):
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_admin(request):
+            return self.admin_handler(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_admin(request):
+            return await self.admin_handler(request)
+        return await self.get_response(request)
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, REQUEST_TIMING_ATTRIBUTE, None)
+        if timing is not None:
+            timing.start_view()
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, REQUEST_TIMING_ATTRIBUTE, None)
+        if timing is not None:
+            timing.start_render(response)
+        return response
+
+    def finish(self, request, response, timing):
+        timing.finish()
+        response['Server-Timing'] = timing.server_timing()
+        slow = timing.duration * 1000 >= settings.REQUEST_TIMING_SLOW_MS
+        if slow or random.random() < settings.REQUEST_TIMING_SAMPLE_RATE:
+            resolver_match = getattr(request, 'resolver_match', None)
+            timing_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': getattr(resolver_match, 'view_name', None),
+                'status': response.status_code,
+                'slow': slow,
+                **timing.as_dict(),
+            }, ensure_ascii=False))
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming()
+        setattr(request, REQUEST_TIMING_ATTRIBUTE, timing)
+        timing.wrap_connections()
+        with timing.stack:
+            response = self.get_response(request)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        setattr(request, REQUEST_TIMING_ATTRIBUTE, timing)
+        await sync_to_async(timing.wrap_connections)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(timing.stack.close)()
+        return self.finish(request, response, timing)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def observe(self, request, response, started):
+        resolver_match = getattr(request, 'resolver_match', None)
+        route = getattr(resolver_match, 'view_name', None) or 'unmatched'
+        method = request.method
+        if method not in METRICS_HTTP_METHODS:
+            method = METRICS_OTHER_METHOD
+        REQUEST_LATENCY.labels(
+            route, method, response.status_code
+        ).observe(perf_counter() - started)
+        timing = getattr(request, REQUEST_TIMING_ATTRIBUTE, None)
+        if timing is not None:
+            REQUEST_QUERIES.labels(route).observe(
+                timing.queries.queries
+            )
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route).observe(
+                len(response.content)
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            response = self.get_response(request)
+        return self.observe(request, response, started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress():
+            response = await self.get_response(request)
+        return self.observe(request, response, started)
+
+
+class NPlusOneMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.N_PLUS_ONE_DETECTION not in ('log', 'raise'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def check(self, request, response, counter):
+        resolver_match = getattr(request, 'resolver_match', None)
+        route = getattr(resolver_match, 'view_name', None)
+        repeated = counter.report()
+        if not repeated or route in settings.N_PLUS_ONE_ALLOWLIST:
+            return response
+        for query in repeated:
+            n_plus_one_logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': route,
+                **query,
+            }, ensure_ascii=False))
+        if settings.N_PLUS_ONE_DETECTION == 'raise':
+            raise NPlusOneError(
+                f'{request.method} {request.path}: '
+                + '; '.join(
+                    f'{query["count"]} x {query["sql"]} '
+                    f'({" <- ".join(query["origin"])})'
+                    for query in repeated
+                )
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryShapeCounter(settings.N_PLUS_ONE_THRESHOLD)
+        counter.wrap_connections()
+        with counter.stack:
+            response = self.get_response(request)
+        return self.check(request, response, counter)
+
+    async def __acall__(self, request):
+        counter = QueryShapeCounter(settings.N_PLUS_ONE_THRESHOLD)
+        await sync_to_async(counter.wrap_connections)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counter.stack.close)()
+        return self.check(request, response, counter)
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def compress(self, request, response):
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+        content = compress(encoding, response.content)
+        if len(content) >= len(response.content):
+            return response
+        return set_encoded_content(response, encoding, content)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
@@ -1,3 +1,5 @@
+from django.core.paginator import InvalidPage, Page
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 
 from recipes.constants import PAGE_SIZE
@@ -6,3 +8,29 @@ from recipes.constants import PAGE_SIZE
 class PageLimitPagination(PageNumberPagination):
     page_size = PAGE_SIZE
     page_size_query_param = 'limit'
+
+
+class AsyncPageLimitPagination(PageLimitPagination):
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            page_number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number,
+                message=str(exc)
+            ))
+        bottom = (page_number - 1) * page_size
+        objects = [
+            obj async for obj in queryset[bottom:bottom + page_size]
+        ]
+        self.page = Page(objects, page_number, paginator)
+        return objects
+
+    def get_paginated_data(self, data):
+        return self.get_paginated_response(data).data
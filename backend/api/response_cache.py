@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+
+from recipes.constants import (
+    RESPONSE_CACHE_FORMAT,
+    RESPONSE_CACHE_KEY,
+    RESPONSE_CACHE_NAME,
+)
+from recipes.utils import get_response_cache_version
+from .compression import (
+    build_compressed_variants,
+    get_variant_response,
+    negotiate_encoding,
+)
+from .metrics import count_cache_lookup
+
+
+def get_response_cache_key(request):
+    return RESPONSE_CACHE_KEY.format(
+        get_response_cache_version(),
+        hashlib.sha1(
+            f'{request.accepted_media_type}|{request.get_full_path()}'.encode()
+        ).hexdigest(),
+    )
+
+
+class CachedResponseMixin:
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def is_cacheable(self, request):
+        return (
+            request.user.is_anonymous
+            and request.accepted_renderer.format == RESPONSE_CACHE_FORMAT
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+        key = get_response_cache_key(request)
+        entry = cache.get(key)
+        count_cache_lookup(RESPONSE_CACHE_NAME, entry is not None)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            response = self.finalize_response(
+                request, response, *args, **kwargs
+            )
+            entry = build_compressed_variants(response.render())
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        response = get_variant_response(entry, negotiate_encoding(request))
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
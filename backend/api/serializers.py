@@ -1,16 +1,28 @@
+from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.urls import reverse
+from django.utils.encoding import filepath_to_uri
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 from recipes.constants import (
-    AVATAR_FIELD_NAME,
+    EXPORT_STATUS_DONE,
     FAVORITE_FOR_SERIALIZER,
-    IMAGE_FIELD_NAME,
+    JWT_USER_CLAIMS,
+    MEDIA_BASE_URL_ATTRIBUTE,
     MIN_COOKING_TIME,
     MIN_INGREDIENT_AMOUNT,
     SHOPPING_CART_FOR_SERIALIZER,
 )
+from recipes.ingredient_index import ingredient_index
 from recipes.models import (
+    ExportJob,
     Favorite,
     Ingredient,
     IngredientRecipe,
@@ -20,35 +32,33 @@ from recipes.models import (
     Tag,
     User,
 )
+from recipes.utils import mark_similar_recipes_stale
 from .filters import get_is_in_special_list
 
 
-def absolute_url_representation(representation, serializer, image_name):
-    request = serializer.context['request']
-    image_url = representation[image_name]
-    representation[image_name] = request.build_absolute_uri(image_url)
-    return representation
+def get_media_base_url(request):
+    base_url = getattr(request, MEDIA_BASE_URL_ATTRIBUTE, None)
+    if base_url is None:
+        base_url = settings.MEDIA_BASE_URL or request.build_absolute_uri(
+            settings.MEDIA_URL
+        )
+        setattr(request, MEDIA_BASE_URL_ATTRIBUTE, base_url)
+    return base_url
 
 
-class ToRepresentationImageSerializer(serializers.Serializer):
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        request = self.context['request']
-        image_url = representation.get(self.image_name)
-        if image_url:
-            representation[self.image_name] = request.build_absolute_uri(
-                image_url
-            )
-        return representation
+class MediaImageField(Base64ImageField):
+    def to_representation(self, file):
+        if not file:
+            return None
+        return (
+            get_media_base_url(self.context['request'])
+            + filepath_to_uri(file.name)
+        )
 
 
-class UserReadSerializer(
-    serializers.ModelSerializer,
-    ToRepresentationImageSerializer,
-):
+class UserReadSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
-    avatar = Base64ImageField(required=False, allow_null=True)
-    image_name = AVATAR_FIELD_NAME
+    avatar = MediaImageField(required=False, allow_null=True)
 
     class Meta:
         model = User
@@ -92,11 +102,8 @@ class UserWriteSerializer(serializers.ModelSerializer):
         return user
 
 
-class SubscribeRecipeSerializer(
-    serializers.ModelSerializer,
-    ToRepresentationImageSerializer,
-):
-    image_name = AVATAR_FIELD_NAME
+class SubscribeRecipeSerializer(serializers.ModelSerializer):
+    image = MediaImageField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -117,7 +124,6 @@ class SubscribeRecipeSerializer(
 class SubscribeUserSerializer(
     UserReadSerializer,
 ):
-    image_name = AVATAR_FIELD_NAME
     recipes = SubscribeRecipeSerializer(
         many=True,
         read_only=True
@@ -156,12 +162,8 @@ class SubscribeUserSerializer(
         return representation
 
 
-class AvatarSerializer(
-    serializers.ModelSerializer,
-    ToRepresentationImageSerializer,
-):
-    image_name = AVATAR_FIELD_NAME
-    avatar = Base64ImageField()
+class AvatarSerializer(serializers.ModelSerializer):
+    avatar = MediaImageField()
 
     class Meta:
         model = User
@@ -247,11 +249,7 @@ class IngredientRecipeWriteSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeReadSerializer(
-    serializers.ModelSerializer,
-    ToRepresentationImageSerializer,
-):
-    image_name = IMAGE_FIELD_NAME
+class RecipeReadSerializer(serializers.ModelSerializer):
     author = UserReadSerializer()
     tags = TagSerializer(
         many=True,
@@ -260,7 +258,7 @@ class RecipeReadSerializer(
         many=True,
         source='recipe_ingredients'
     )
-    image = Base64ImageField()
+    image = MediaImageField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -373,6 +371,8 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
                 amount=ingredient_dict['amount']
             ) for ingredient_dict in ingredients
         )
+        ingredient_index.update_recipe_on_commit(recipe.id)
+        mark_similar_recipes_stale((recipe.id,))
         return recipe
 
     def create(self, validated_data):
@@ -394,11 +394,8 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         ).data
 
 
-class RecipeFavoriteAndShoppingCartSerializer(
-    serializers.ModelSerializer,
-    ToRepresentationImageSerializer,
-):
-    image_name = IMAGE_FIELD_NAME
+class RecipeFavoriteAndShoppingCartSerializer(serializers.ModelSerializer):
+    image = MediaImageField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -477,3 +474,66 @@ class SubscribeSerializer(serializers.ModelSerializer):
                 'Данный пользователь уже в подписках'
             )
         return super().validate(data)
+
+
+def set_user_claims(token, user):
+    for name in JWT_USER_CLAIMS:
+        token[name] = getattr(user, name)
+    return token
+
+
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        return set_user_claims(super().get_token(user), user)
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{
+                jwt_settings.USER_ID_FIELD:
+                    refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+            },
+            is_active=True,
+        ).first()
+        if user is None:
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+        return {
+            'access': str(set_user_claims(refresh.access_token, user))
+        }
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = (
+            'id',
+            'kind',
+            'status',
+            'error',
+            'created_at',
+            'finished_at',
+            'download_url',
+        )
+        read_only_fields = (
+            'status',
+            'error',
+            'created_at',
+            'finished_at',
+        )
+
+    def get_download_url(self, job):
+        if job.status != EXPORT_STATUS_DONE:
+            return None
+        return self.context['request'].build_absolute_uri(
+            reverse('exports-download', args=(job.id,))
+        )
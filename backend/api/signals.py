@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.ingredient_index import ingredient_index
+from recipes.models import (
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    RecipeRanking,
+    SimilarRecipe,
+    Subscribe,
+    Tag,
+    User,
+)
+from recipes.utils import (
+    backfill_timeline,
+    fan_out_recipe,
+    invalidate_response_cache,
+    mark_similar_recipes_stale,
+    remove_from_timeline,
+)
+from .authentication import invalidate_token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token_cache(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    if created:
+        return
+    invalidate_token_cache(*Token.objects.filter(
+        user=instance
+    ).values_list('key', flat=True))
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        fan_out_recipe.enqueue(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def create_recipe_ranking(sender, instance, created, **kwargs):
+    if created:
+        RecipeRanking.objects.create(recipe=instance)
+
+
+@receiver(pre_delete, sender=Recipe)
+def mark_similar_to_deleted_recipe_stale(sender, instance, **kwargs):
+    mark_similar_recipes_stale(SimilarRecipe.objects.filter(
+        similar=instance
+    ).values_list('recipe_id', flat=True))
+
+
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+def update_ingredient_index(sender, instance, **kwargs):
+    ingredient_index.update_recipe_on_commit(instance.recipe_id)
+
+
+@receiver(post_save, sender=Subscribe)
+def backfill_subscription_timeline(sender, instance, created, **kwargs):
+    if created:
+        backfill_timeline.enqueue(
+            instance.user_id, instance.subscribed_user_id
+        )
+
+
+@receiver(post_delete, sender=Subscribe)
+def clear_subscription_timeline(sender, instance, **kwargs):
+    remove_from_timeline(instance.user_id, instance.subscribed_user_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cached_responses(sender, **kwargs):
+    transaction.on_commit(invalidate_response_cache)
@@ -0,0 +1,330 @@
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import StatelessJWTAuthentication
+from api.middleware import PrimaryDatabasePinMiddleware
+from api.serializers import UserClaimsTokenObtainPairSerializer
+from api.views import UserViewSet
+from backend.db_routers import ReplicaRouter, read_from_primary
+from recipes.constants import PRIMARY_DATABASE_PIN_COOKIE
+from recipes.models import (
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    Tag,
+    TimelineEntry,
+    User,
+)
+from recipes.utils import search_recipes
+
+
+class RecipeSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='password',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name='Борщ украинский',
+            text='Варить два часа на медленном огне.',
+            image='recipes/images/borsch.png',
+            cooking_time=90,
+        )
+        IngredientRecipe.objects.create(
+            recipe=cls.recipe,
+            ingredient=Ingredient.objects.create(
+                name='Свёкла столовая',
+                measurement_unit='г',
+            ),
+            amount=300,
+        )
+        Recipe.objects.create(
+            author=cls.author,
+            name='Омлет',
+            text='Взбить яйца с молоком.',
+            image='recipes/images/omelette.png',
+            cooking_time=10,
+        )
+
+    def test_search_finds_recipe_after_migrations(self):
+        response = APIClient().get('/api/recipes/', {'q': 'борщ'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.recipe.id)
+
+    def test_search_by_name_text_and_ingredient(self):
+        for query in ('борщ', 'огне', 'свёкла'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    list(search_recipes(Recipe.objects.all(), query)),
+                    [self.recipe],
+                )
+
+
+@override_settings(DB_PRIMARY_PIN_SECONDS=5)
+@patch(
+    'api.middleware.get_replicas', return_value=['replica_1', 'replica_2']
+)
+class ReplicaRouterTests(TestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.router.replicas = ['replica_1', 'replica_2']
+        self.factory = RequestFactory()
+
+    def call(self, request, status=200):
+        aliases = []
+
+        def get_response(request):
+            aliases.extend(
+                self.router.db_for_read(Recipe) for _ in range(20)
+            )
+            return HttpResponse(status=status)
+
+        response = PrimaryDatabasePinMiddleware(get_response)(request)
+        return response, set(aliases)
+
+    def test_request_reads_from_one_replica(self, get_replicas):
+        for _ in range(10):
+            _, aliases = self.call(self.factory.get('/api/recipes/'))
+            self.assertEqual(len(aliases), 1)
+            self.assertIn(aliases.pop(), self.router.replicas)
+
+    def test_write_reads_from_primary_and_sets_pin_cookie(
+        self, get_replicas
+    ):
+        response, aliases = self.call(self.factory.post('/api/recipes/'))
+        self.assertEqual(aliases, {'default'})
+        cookie = response.cookies[PRIMARY_DATABASE_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertTrue(cookie['httponly'])
+
+    def test_failed_write_does_not_set_pin_cookie(self, get_replicas):
+        response, _ = self.call(self.factory.post('/api/recipes/'), 400)
+        self.assertNotIn(PRIMARY_DATABASE_PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_reads_from_primary(self, get_replicas):
+        request = self.factory.get('/api/recipes/')
+        request.COOKIES[PRIMARY_DATABASE_PIN_COOKIE] = '1'
+        _, aliases = self.call(request)
+        self.assertEqual(aliases, {'default'})
+
+    def test_read_from_primary(self, get_replicas):
+        with read_from_primary():
+            self.assertEqual(self.router.db_for_read(Recipe), 'default')
+        self.assertIn(self.router.db_for_read(Recipe), self.router.replicas)
+
+    def test_writes_go_to_primary(self, get_replicas):
+        self.assertEqual(self.router.db_for_write(Recipe), 'default')
+
+
+@override_settings(AUTH_TOKEN_CACHE_TIMEOUT=60)
+class TokenCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='password',
+        )
+        self.client = APIClient()
+        response = self.client.post('/api/auth/token/login/', {
+            'email': 'user@example.com',
+            'password': 'password',
+        })
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {response.data["auth_token"]}'
+        )
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+
+    def test_logout_invalidates_cached_token(self):
+        response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_deactivation_invalidates_cached_token(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+
+@override_settings(TASKS_EAGER=True, FEED_POPULAR_AUTHORS_CACHE_TIMEOUT=0)
+class FeedTests(TestCase):
+
+    def setUp(self):
+        self.author, self.reader = (
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@example.com',
+                password='password',
+            )
+            for username in ('author', 'reader')
+        )
+        self.old_recipe = self.create_recipe('Старый рецепт')
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_recipe(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=self.author,
+                name=name,
+                text='Описание.',
+                image='recipes/images/recipe.png',
+                cooking_time=10,
+            )
+
+    def subscribe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/users/{self.author.id}/subscribe/'
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def get_feed_ids(self):
+        response = self.client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_feed_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.get('/api/recipes/feed/').status_code, 401
+        )
+
+    def test_subscription_backfills_and_fans_out(self):
+        self.assertEqual(self.get_feed_ids(), [])
+        self.subscribe()
+        self.assertEqual(self.get_feed_ids(), [self.old_recipe.id])
+        new_recipe = self.create_recipe('Новый рецепт')
+        self.assertEqual(
+            self.get_feed_ids(), [new_recipe.id, self.old_recipe.id]
+        )
+
+    def test_unsubscribe_clears_feed(self):
+        self.subscribe()
+        self.client.delete(f'/api/users/{self.author.id}/subscribe/')
+        self.assertEqual(self.get_feed_ids(), [])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_author_is_read_without_timeline(self):
+        self.subscribe()
+        new_recipe = self.create_recipe('Новый рецепт')
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(
+            self.get_feed_ids(), [new_recipe.id, self.old_recipe.id]
+        )
+
+
+class ResponseCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.create(name='Завтрак', slug='breakfast')
+        cls.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='password',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tags/', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response, any(
+            Tag._meta.db_table in query['sql'] for query in queries
+        )
+
+    def test_anonymous_json_is_cached_with_headers(self):
+        first, _ = self.get()
+        second, queried = self.get()
+        self.assertFalse(queried)
+        self.assertEqual(second.content, first.content)
+        for header in ('Content-Type', 'Allow', 'Vary'):
+            with self.subTest(header=header):
+                self.assertEqual(second[header], first[header])
+
+    def test_browsable_api_is_not_cached(self):
+        self.get(HTTP_ACCEPT='text/html')
+        response, queried = self.get(HTTP_ACCEPT='text/html')
+        self.assertTrue(queried)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+
+    def test_authenticated_request_is_not_cached(self):
+        self.client.force_authenticate(self.user)
+        self.get()
+        _, queried = self.get()
+        self.assertTrue(queried)
+
+
+PNG = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+)
+
+
+@patch.object(
+    UserViewSet, 'authentication_classes', (StatelessJWTAuthentication,)
+)
+class StatelessJWTAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='password',
+            first_name='Иван',
+        )
+
+    def setUp(self):
+        self.token = UserClaimsTokenObtainPairSerializer.get_token(
+            self.user
+        ).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        media_root = TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def get_me(self):
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_token_has_no_profile_claims(self):
+        for claim in ('username', 'email', 'first_name', 'avatar'):
+            with self.subTest(claim=claim):
+                self.assertNotIn(claim, self.token)
+
+    def test_profile_change_is_visible_with_same_token(self):
+        User.objects.filter(id=self.user.id).update(first_name='Пётр')
+        self.assertEqual(self.get_me()['first_name'], 'Пётр')
+
+    def test_avatar_change_is_visible_with_same_token(self):
+        response = self.client.put(
+            '/api/users/me/avatar/', {'avatar': PNG}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_me()['avatar'], response.data['avatar'])
+        response = self.client.delete('/api/users/me/avatar/')
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(self.get_me()['avatar'])
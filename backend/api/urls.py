@@ -1,15 +1,41 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import IngredientViewSet, RecipeViewSet, TagViewSet, UserViewSet
+from recipes.constants import SUBSCRIPTIONS_URL
+from .views import (
+    ExportViewSet,
+    IngredientViewSet,
+    RecipeViewSet,
+    TagViewSet,
+    UserViewSet,
+)
 
 router = DefaultRouter()
 router.register('users', UserViewSet, basename='users')
 router.register('tags', TagViewSet, basename='tags')
 router.register('recipes', RecipeViewSet, basename='recipes')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
+router.register('exports', ExportViewSet, basename='exports')
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+]
+
+if settings.JWT_AUTH:
+    urlpatterns += [
+        path('auth/', include('djoser.urls.jwt')),
+    ]
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    urlpatterns += [
+        path('recipes/', async_views.recipe_list),
+        path('recipes/<int:id>/', async_views.recipe_detail),
+        path(f'users/{SUBSCRIPTIONS_URL}/', async_views.subscriptions),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
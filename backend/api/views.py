@@ -1,11 +1,9 @@
-import hashlib
-
 from django.conf import settings
-from django.db.models import Count, Sum
-from django.http import HttpResponse
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import serializers, status, viewsets
+from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import (
     AllowAny,
@@ -17,31 +15,48 @@ from rest_framework.response import Response
 from recipes.constants import (
     AVATAR_URL,
     DOWNLOAD_SHOPPING_CART_URL,
+    EXPORT_DOWNLOAD_URL,
+    EXPORT_FILENAMES,
+    EXPORT_STATUS_DONE,
     FAVORITE_URL,
+    FEED_URL,
     GET_LINK_URL,
     SELF_URL,
     SET_PASSWORD_URL,
     SHOPPING_CART_FILENAME,
     SHOPPING_CART_URL,
-    SHORT_LINK_MAX_LENGTH,
+    SHORT_LINK_CACHE_NAME,
+    SIMILAR_URL,
     SUBSCRIBE_URL,
     SUBSCRIPTIONS_URL,
 )
+from recipes.exports import start_export
 from recipes.models import (
     Favorite,
     Ingredient,
-    IngredientRecipe,
     Recipe,
     ShoppingCart,
-    ShortLink,
     Tag,
     User,
 )
+from recipes.utils import (
+    encode_short_link_code,
+    get_feed_queryset,
+    get_recipe_id_by_code,
+    get_shopping_cart_ingredients,
+)
 from .filters import NameSearchFilter, RecipeFilter
+from .metrics import (
+    count_cache_lookup,
+    is_internal_address,
+    render_metrics,
+)
 from .pagination import PageLimitPagination
 from .permissions import IsAuthor
+from .response_cache import CachedResponseMixin
 from .serializers import (
     AvatarSerializer,
+    ExportJobSerializer,
     FavoriteSerializer,
     IngredientSerializer,
     PasswordSerializer,
@@ -57,10 +72,22 @@ from .serializers import (
 )
 
 
+def metrics(request):
+    if not is_internal_address(request.META.get('REMOTE_ADDR', '')):
+        raise Http404
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
+
+
 def short_link_redirect(request, code):
-    short_link = get_object_or_404(ShortLink, code=code)
+    try:
+        recipe_id, hit = get_recipe_id_by_code(code)
+    except ValueError:
+        raise Http404
+    if hit is not None:
+        count_cache_lookup(SHORT_LINK_CACHE_NAME, hit)
     return redirect(
-        f'https://{settings.DOMAIN}/recipes/{short_link.recipe.id}/'
+        f'https://{settings.DOMAIN}/recipes/{recipe_id}/'
     )
 
 
@@ -149,7 +176,7 @@ class UserViewSet(viewsets.ModelViewSet):
         queryset = self.get_recipes_annotated_queryset(
             queryset=User.objects.filter(
                 id__in=request.user.subscriptions.all().values_list(
-                    'user_id',
+                    'subscribed_user_id',
                     flat=True
                 )
             )
@@ -169,7 +196,10 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        user = request.user
+        if user.get_deferred_fields():
+            user = get_object_or_404(self.get_queryset(), pk=user.pk)
+        serializer = self.get_serializer(user)
         return Response(
             serializer.data,
             status=status.HTTP_200_OK
@@ -195,7 +225,8 @@ class UserViewSet(viewsets.ModelViewSet):
                 serializer.data,
                 status=status.HTTP_200_OK
             )
-        user.avatar.delete()
+        user.avatar = None
+        user.save(update_fields=['avatar'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -219,7 +250,7 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     http_method_names = ['get']
@@ -228,7 +259,7 @@ class TagViewSet(viewsets.ModelViewSet):
     ordering = ('name',)
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     http_method_names = ['get']
@@ -251,6 +282,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.request.method in ('PATCH', 'DELETE'):
             return (IsAuthor(),)
+        if self.action == 'feed':
+            return super().get_permissions()
         return (IsAuthenticatedOrReadOnly(),)
 
     def get_serializer_context(self):
@@ -278,18 +311,34 @@ class RecipeViewSet(viewsets.ModelViewSet):
             self.get_queryset(),
             id=id
         )
-        short_link_object, created = ShortLink.objects.get_or_create(
-            recipe=recipe,
-            defaults={'code': hashlib.md5(
-                str(recipe.id).encode()
-            ).hexdigest()[:SHORT_LINK_MAX_LENGTH]}
+        short_link = (
+            f'https://{settings.DOMAIN}/s/'
+            f'{encode_short_link_code(recipe.id)}'
         )
-        short_link = f'https://{settings.DOMAIN}/s/{short_link_object.code}'
         return Response(
             {'short-link': short_link},
             status=status.HTTP_200_OK
         )
 
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path=SIMILAR_URL,
+        permission_classes=(AllowAny,)
+    )
+    def similar(self, request, id=None):
+        recipe = get_object_or_404(
+            self.get_queryset(),
+            id=id
+        )
+        return Response(RecipeFavoriteAndShoppingCartSerializer(
+            Recipe.objects.filter(
+                similar_to__recipe=recipe
+            ).order_by('-similar_to__score'),
+            many=True,
+            context=self.get_serializer_context(),
+        ).data)
+
     def add_or_delete_from_special_list(
         self,
         request,
@@ -357,6 +406,17 @@ class RecipeViewSet(viewsets.ModelViewSet):
             model=Favorite
         )
 
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=FEED_URL,
+        permission_classes=(IsAuthenticated,),
+    )
+    def feed(self, request):
+        page = self.paginate_queryset(get_feed_queryset(request.user))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(
         detail=False,
         methods=['get'],
@@ -364,20 +424,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def download_shopping_cart(self, request):
-        ingredients = (
-            IngredientRecipe.objects.filter(
-                recipe__in=ShoppingCart.objects.filter(
-                    user=request.user
-                ).values('recipe')
-            ).values(
-                'ingredient__name',
-                'ingredient__measurement_unit'
-            ).annotate(
-                total_amount=Sum('amount')
-            ).order_by(
-                'ingredient__name'
-            )
-        )
+        ingredients = get_shopping_cart_ingredients(request.user)
         shop_list = ''
         for ingredient in ingredients:
             name = ingredient['ingredient__name']
@@ -390,3 +437,47 @@ class RecipeViewSet(viewsets.ModelViewSet):
             f'filename={SHOPPING_CART_FILENAME}'
         )
         return response
+
+
+class ExportViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    serializer_class = ExportJobSerializer
+    permission_classes = (IsAuthenticated,)
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        return self.request.user.exports.all()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = start_export(request.user, serializer.validated_data['kind'])
+        return Response(
+            self.get_serializer(job).data,
+            status=(
+                status.HTTP_201_CREATED
+                if job.status == EXPORT_STATUS_DONE
+                else status.HTTP_202_ACCEPTED
+            ),
+        )
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path=EXPORT_DOWNLOAD_URL,
+    )
+    def download(self, request, id=None):
+        job = self.get_object()
+        if job.status != EXPORT_STATUS_DONE:
+            return Response(
+                {'detail': 'Файл ещё не готов.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=EXPORT_FILENAMES[job.kind],
+        )
@@ -0,0 +1,41 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+use_primary = ContextVar('use_primary', default=False)
+current_replica = ContextVar('current_replica', default=None)
+
+
+def get_replicas():
+    return [alias for alias in settings.DATABASES if alias != 'default']
+
+
+@contextmanager
+def read_from_primary():
+    token = use_primary.set(True)
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+class ReplicaRouter:
+
+    def __init__(self):
+        self.replicas = get_replicas()
+
+    def db_for_read(self, model, **hints):
+        if use_primary.get() or not self.replicas:
+            return 'default'
+        return current_replica.get() or random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+from copy import deepcopy
+from datetime import timedelta
+from ipaddress import ip_network
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +30,10 @@ DEBUG = True
 
 DOMAIN = 'foodgramhostname.zapto.org'
 
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+ASYNC_VIEWS = SERVER_MODE == 'asgi'
+
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', DOMAIN]
 
 CSRF_TRUSTED_ORIGINS = ['https://' + DOMAIN]
@@ -42,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'rest_framework_simplejwt',
     'djoser',
     'recipes.apps.RecipesConfig',
     'api.apps.ApiConfig',
@@ -51,15 +59,85 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'recipes.User'
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.RequestTimingMiddleware',
+    'api.middleware.NPlusOneMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.PrimaryDatabasePinMiddleware',
+    'api.middleware.ShortLinkRedirectMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api.middleware.AdminMiddleware',
+]
+
+ADMIN_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', 'true').lower() == 'true'
+
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', 0.01)
+)
+
+REQUEST_TIMING_SLOW_MS = float(os.getenv('REQUEST_TIMING_SLOW_MS', 500))
+
+METRICS = os.getenv('METRICS', 'true').lower() == 'true'
+
+METRICS_ALLOWED_NETWORKS = [
+    ip_network(network) for network in os.getenv(
+        'METRICS_ALLOWED_NETWORKS',
+        '127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+    ).split(',') if network
+]
+
+N_PLUS_ONE_DETECTION = os.getenv('N_PLUS_ONE_DETECTION', 'off').lower()
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+
+N_PLUS_ONE_ALLOWLIST = [
+    route for route in os.getenv('N_PLUS_ONE_ALLOWLIST', '').split(',')
+    if route
+]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.n_plus_one': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'recipes.exports': {
+            'handlers': ['console'],
+            'level': 'ERROR',
+            'propagate': False,
+        },
+        'recipes.tasks': {
+            'handlers': ['console'],
+            'level': 'ERROR',
+            'propagate': False,
+        },
+    },
+}
+
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -80,21 +158,149 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+ASGI_APPLICATION = 'backend.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
+DB_ENGINE = os.getenv('DB_ENGINE', 'postgresql').lower()
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'django'),
+            'USER': os.getenv('POSTGRES_USER', 'django'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', ''),
+            'PORT': os.getenv('DB_PORT', 5432),
+            'CONN_MAX_AGE': int(os.getenv(
+                'DB_CONN_MAX_AGE',
+                0 if SERVER_MODE == 'asgi' else 60
+            )),
+            'CONN_HEALTH_CHECKS': (
+                os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+            ),
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'false').lower()
+                == 'true'
+            ),
+        }
+    }
+
+if DB_ENGINE == 'sqlite':
+    DB_REPLICAS = [
+        {'NAME': path}
+        for path in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if path
+    ]
+else:
+    DB_REPLICAS = []
+    for replica in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+        if not replica:
+            continue
+        address, _, name = replica.partition('/')
+        host, _, port = address.partition(':')
+        DB_REPLICAS.append({
+            'NAME': name or DATABASES['default']['NAME'],
+            'HOST': host,
+            'PORT': port or DATABASES['default']['PORT'],
+        })
+
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    DATABASES[f'replica_{number}'] = {
+        **deepcopy(DATABASES['default']),
+        **replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.db_routers.ReplicaRouter']
+
+DB_PRIMARY_PIN_SECONDS = int(os.getenv('DB_PRIMARY_PIN_SECONDS', 5))
+
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND',
+    'django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHE_SHARED = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('POSTGRES_DB', 'django'),
-        'USER': os.getenv('POSTGRES_USER', 'django'),
-        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
-        'HOST': os.getenv('DB_HOST', ''),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
     }
 }
 
+if CACHE_BACKEND != 'django.core.cache.backends.redis.RedisCache':
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+    }
+
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv(
+    'AUTH_TOKEN_CACHE_TIMEOUT',
+    60 if CACHE_SHARED else 0
+))
+
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv('FEED_FANOUT_MAX_FOLLOWERS', 1000))
+
+FEED_POPULAR_AUTHORS_CACHE_TIMEOUT = int(
+    os.getenv('FEED_POPULAR_AUTHORS_CACHE_TIMEOUT', 300)
+)
+
+INGREDIENT_INDEX_REBUILD_INTERVAL = int(
+    os.getenv('INGREDIENT_INDEX_REBUILD_INTERVAL', 3600)
+)
+
+INGREDIENT_INDEX_MAX_CHANGES = int(
+    os.getenv('INGREDIENT_INDEX_MAX_CHANGES', 1000)
+)
+
+RANKING_TRENDING_HALF_LIFE_HOURS = float(
+    os.getenv('RANKING_TRENDING_HALF_LIFE_HOURS', 72)
+)
+
+RANKING_TRENDING_WINDOW_DAYS = int(
+    os.getenv('RANKING_TRENDING_WINDOW_DAYS', 30)
+)
+
+EXPORT_FONT_PATH = os.getenv(
+    'EXPORT_FONT_PATH',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+COMPRESSION = os.getenv('COMPRESSION', 'true').lower() == 'true'
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 3600))
+
+TASKS_EAGER = os.getenv('TASKS_EAGER', 'false').lower() == 'true'
+
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', 3))
+
+TASK_RETRY_DELAY = int(os.getenv('TASK_RETRY_DELAY', 10))
+
+TASK_VISIBILITY_TIMEOUT = int(os.getenv('TASK_VISIBILITY_TIMEOUT', 300))
+
+TASK_WORKER_CONCURRENCY = int(os.getenv('TASK_WORKER_CONCURRENCY', 2))
+
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', 1))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -137,6 +343,12 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+MEDIA_BASE_URL = os.getenv('MEDIA_BASE_URL', '')
+
+EXPORT_ROOT = os.getenv('EXPORT_ROOT', os.path.join(BASE_DIR, 'private'))
+
+EXPORT_RETENTION_DAYS = int(os.getenv('EXPORT_RETENTION_DAYS', 7))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -148,6 +360,27 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 }
+
+JWT_AUTH = os.getenv('JWT_AUTH', 'false').lower() == 'true'
+
+if JWT_AUTH:
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'].append(
+        'api.authentication.StatelessJWTAuthentication'
+    )
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 5))
+    ),
+    'REFRESH_TOKEN_LIFETIME': timedelta(
+        days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', 1))
+    ),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER':
+        'api.serializers.UserClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER':
+        'api.serializers.UserClaimsTokenRefreshSerializer',
+}
@@ -1,10 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
-from api.views import short_link_redirect
+from api.views import metrics
+from recipes.constants import METRICS_URL_NAME, SHORT_LINK_URL_NAME
+
+if settings.ASYNC_VIEWS:
+    from api.async_views import short_link_redirect
+else:
+    from api.views import short_link_redirect
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
-    path('s/<str:code>/', short_link_redirect, name='short_link_redirect'),
+    path('s/<str:code>/', short_link_redirect, name=SHORT_LINK_URL_NAME),
 ]
+
+if settings.METRICS:
+    urlpatterns.append(path('metrics', metrics, name=METRICS_URL_NAME))
@@ -0,0 +1,68 @@
+import os
+
+
+def get_cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:7000')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'backend.wsgi:application'
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+
+workers = int(os.getenv('GUNICORN_WORKERS', get_cpu_count() * 2 + 1))
+threads = 1
+if worker_class == 'gthread':
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 65))
+
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm')
+
+METRICS = os.getenv('METRICS', 'true').lower() == 'true'
+
+if METRICS:
+    os.environ.setdefault(
+        'PROMETHEUS_MULTIPROC_DIR',
+        os.path.join(worker_tmp_dir, 'foodgram-metrics')
+    )
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def on_starting(server):
+    if not METRICS:
+        return
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    for name in os.listdir(directory):
+        if name.endswith('.db'):
+            os.remove(os.path.join(directory, name))
+
+
+def post_worker_init(worker):
+    if METRICS:
+        from api.metrics import WORKERS
+
+        WORKERS.set(1)
+
+
+def child_exit(server, worker):
+    if METRICS:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 
+from recipes.constants import ADMIN_ESTIMATED_COUNT_MIN
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -13,6 +19,71 @@ from recipes.models import (
 )
 
 
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(field).annotate(
+                count=Count('pk')
+            ).values('count')
+        ),
+        0,
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        estimate = self.get_estimated_count()
+        if estimate is None or estimate < ADMIN_ESTIMATED_COUNT_MIN:
+            return super().count
+        return estimate
+
+    def get_estimated_count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if query.where or connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [query.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    def set_count(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().page(number)
+        if number < 1:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            if self.count <= bottom + self.per_page:
+                self.set_count(super().count)
+            return self._get_page(rows[:self.per_page], number, self)
+        if rows or number == 1:
+            self.set_count(bottom + len(rows))
+            return self._get_page(rows, number, self)
+        self.set_count(super().count)
+        return super().page(number)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = (
@@ -23,23 +94,23 @@ class UserAdmin(BaseUserAdmin):
         'avatar',
     )
     search_fields = ('username', 'email')
-    list_filter = ('username', 'email')
+    list_filter = ('is_staff', 'is_active')
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
     search_fields = ('name',)
-    list_filter = ('name',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdmin):
     list_display = ('name', 'measurement_unit')
     search_fields = ('name',)
-    list_filter = ('name',)
     empty_value_display = '-пусто-'
 
 
@@ -47,41 +118,68 @@ class IngredientRecipeInline(admin.StackedInline):
     model = IngredientRecipe
     extra = 1
     min_num = 1
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'recipe', 'ingredient'
+        )
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = (
         'name',
         'author',
         'cooking_time',
         'favorites_count',
     )
+    list_select_related = ('author',)
     inlines = (
         IngredientRecipeInline,
     )
+    autocomplete_fields = ('author', 'tags')
     search_fields = ('name', 'author__username', 'author__email')
-    list_filter = ('tags',)
+    list_filter = ('tags', 'pub_date')
     empty_value_display = '-пусто-'
 
-    @admin.display(description='В избранном')
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            favorites_count=count_subquery(
+                Favorite.objects.filter(recipe=OuterRef('pk')),
+                'recipe',
+            ),
+        )
+
+    @admin.display(description='В избранном', ordering='favorites_count')
     def favorites_count(self, obj):
-        return Favorite.objects.filter(
-            recipe=obj
-        ).count()
+        return obj.favorites_count
 
 
 @admin.register(Subscribe)
-class SubscribeAdmin(admin.ModelAdmin):
+class SubscribeAdmin(LargeTableAdmin):
     list_display = (
         'user',
         'get_subscribed_user_recipes',
         'get_subscribed_user'
     )
-
-    @admin.display(description='Кол-во рецептов')
+    list_select_related = ('user', 'subscribed_user')
+    autocomplete_fields = ('user', 'subscribed_user')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            subscribed_user_recipes=count_subquery(
+                Recipe.objects.filter(author=OuterRef('subscribed_user')),
+                'author',
+            ),
+        )
+
+    @admin.display(
+        description='Кол-во рецептов',
+        ordering='subscribed_user_recipes',
+    )
     def get_subscribed_user_recipes(self, obj):
-        return obj.subscribed_user.recipes.count()
+        return obj.subscribed_user_recipes
 
     @admin.display(description='Подписан на пользователя')
     def get_subscribed_user(self, obj):
@@ -89,5 +187,7 @@ class SubscribeAdmin(admin.ModelAdmin):
 
 
 @admin.register(ShortLink)
-class ShortLinkAdmin(admin.ModelAdmin):
+class ShortLinkAdmin(LargeTableAdmin):
     list_display = ('recipe', 'code')
+    list_select_related = ('recipe',)
+    autocomplete_fields = ('recipe',)
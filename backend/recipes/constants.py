@@ -10,8 +10,6 @@ SHORT_LINK_MAX_LENGTH = 6
 IS_SUBSCRIBED_FIELD_NAME = 'is_subscribed'
 IS_FAVORITED_FIELD_NAME = 'is_favorited'
 IS_IN_SHOPPING_CART_FIELD_NAME = 'is_in_shopping_cart'
-AVATAR_FIELD_NAME = 'avatar'
-IMAGE_FIELD_NAME = 'image'
 SHOPPING_CART_FILENAME = "shopping_cart.txt"
 DOWNLOAD_SHOPPING_CART_URL = 'download_shopping_cart'
 FAVORITE_URL = 'favorite'
@@ -27,3 +25,130 @@ USERNAME_STR_WIDTH = 30
 FAVORITE_FOR_SERIALIZER = 'избранном'
 SHOPPING_CART_FOR_SERIALIZER = 'списке покупок'
 MIN_INGREDIENT_AMOUNT = 1
+SHORT_LINK_ALPHABET = (
+    '0123456789'
+    'abcdefghijklmnopqrstuvwxyz'
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+SHORT_LINK_CACHE_SIZE = 4096
+SHORT_LINK_URL_PREFIX = '/s/'
+ADMIN_URL_PREFIX = '/admin/'
+ADMIN_ESTIMATED_COUNT_MIN = 10000
+SHORT_LINK_URL_NAME = 'short_link_redirect'
+PRIMARY_DATABASE_PIN_COOKIE = 'db_primary_pin'
+AUTH_TOKEN_CACHE_PREFIX = 'auth-token:'
+JWT_USER_CLAIMS = ('is_active',)
+INGREDIENTS_BATCH_SIZE = 5000
+SEED_BATCH_SIZE = 5000
+SEED_USERNAME_PREFIX = 'seed-user-'
+SEED_EMAIL_DOMAIN = 'seed.foodgram.local'
+SEED_PASSWORD = 'foodgram-seed'
+SEED_RECIPE_IMAGE = f'{RECIPE_IMAGE_FOLDER}seed.png'
+SEED_TAGS = (
+    ('Завтрак', 'breakfast'),
+    ('Обед', 'lunch'),
+    ('Ужин', 'dinner'),
+    ('Десерт', 'dessert'),
+    ('Выпечка', 'baking'),
+    ('Салат', 'salad'),
+    ('Суп', 'soup'),
+    ('Напиток', 'drink'),
+)
+REQUEST_TIMING_ATTRIBUTE = '_request_timing'
+METRICS_URL_NAME = 'metrics'
+AUTH_TOKEN_CACHE_NAME = 'auth_token'
+RESPONSE_CACHE_NAME = 'response'
+SHORT_LINK_CACHE_NAME = 'short_link'
+METRICS_HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+))
+METRICS_OTHER_METHOD = 'other'
+FEED_URL = 'feed'
+FEED_BACKFILL_LIMIT = 100
+FEED_BATCH_SIZE = 5000
+FEED_POPULAR_AUTHORS_CACHE_KEY = 'feed-popular-authors'
+SEARCH_CONFIG = 'russian'
+SEARCH_FTS_TABLE = 'recipes_recipe_search'
+SEARCH_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+SEARCH_TOKEN_PATTERN = r'\w+'
+INGREDIENT_MATCH_ALL = 'all'
+INGREDIENT_MATCH_ANY = 'any'
+INGREDIENT_MATCH_MOST = 'most'
+INGREDIENT_MATCH_CHOICES = (
+    (INGREDIENT_MATCH_ALL, 'Все ингредиенты'),
+    (INGREDIENT_MATCH_ANY, 'Любой ингредиент'),
+    (INGREDIENT_MATCH_MOST, 'Большинство ингредиентов'),
+)
+INGREDIENT_INDEX_CHUNK_SIZE = 10000
+INGREDIENT_INDEX_VERSION_NAME = 'ingredient-index'
+CACHE_VERSION_NAME_MAX_LENGTH = 64
+RANKING_FAVORITE_WEIGHT = 1.0
+RANKING_SHOPPING_CART_WEIGHT = 2.0
+RANKING_BATCH_SIZE = 5000
+RECIPE_ORDERING_POPULAR = 'popular'
+RECIPE_ORDERING_TRENDING = 'trending'
+RECIPE_ORDERING_CHOICES = (
+    (RECIPE_ORDERING_POPULAR, 'Популярные'),
+    (RECIPE_ORDERING_TRENDING, 'Популярные за последнее время'),
+)
+RECIPE_ORDERING_FIELDS = {
+    RECIPE_ORDERING_POPULAR: 'ranking__popularity',
+    RECIPE_ORDERING_TRENDING: 'ranking__trending',
+}
+SEED_ACTIVITY_DAYS = 30
+SIMILAR_URL = 'similar'
+SIMILAR_RECIPES_LIMIT = 10
+SIMILAR_BATCH_SIZE = 1000
+SIMILAR_BATCH_CELLS = 2 ** 25
+SIMILAR_TAG_WEIGHT = 0.5
+EXPORT_FOLDER = 'exports/'
+EXPORT_DOWNLOAD_URL = 'download'
+EXPORT_FORMAT_VERSION = 1
+EXPORT_HASH_MAX_LENGTH = 64
+EXPORT_CHOICE_MAX_LENGTH = 16
+EXPORT_FONT_NAME = 'DejaVuSans'
+EXPORT_KIND_SHOPPING_CART = 'shopping_cart'
+EXPORT_KIND_FAVORITES = 'favorites'
+EXPORT_KIND_CHOICES = (
+    (EXPORT_KIND_SHOPPING_CART, 'Список покупок'),
+    (EXPORT_KIND_FAVORITES, 'Книга избранных рецептов'),
+)
+EXPORT_FILENAMES = {
+    EXPORT_KIND_SHOPPING_CART: 'shopping_cart.pdf',
+    EXPORT_KIND_FAVORITES: 'favorites.pdf',
+}
+EXPORT_STATUS_PENDING = 'pending'
+EXPORT_STATUS_RUNNING = 'running'
+EXPORT_STATUS_DONE = 'done'
+EXPORT_STATUS_FAILED = 'failed'
+EXPORT_STATUS_CHOICES = (
+    (EXPORT_STATUS_PENDING, 'В очереди'),
+    (EXPORT_STATUS_RUNNING, 'Выполняется'),
+    (EXPORT_STATUS_DONE, 'Готово'),
+    (EXPORT_STATUS_FAILED, 'Ошибка'),
+)
+TASK_NAME_MAX_LENGTH = 255
+TASK_WORKER_MAX_LENGTH = 255
+TASK_STATUS_MAX_LENGTH = 16
+TASK_PRIORITY_DEFAULT = 0
+TASK_PRIORITY_HIGH = 10
+TASK_STATUS_QUEUED = 'queued'
+TASK_STATUS_RUNNING = 'running'
+TASK_STATUS_FAILED = 'failed'
+TASK_STATUS_CHOICES = (
+    (TASK_STATUS_QUEUED, 'В очереди'),
+    (TASK_STATUS_RUNNING, 'Выполняется'),
+    (TASK_STATUS_FAILED, 'Ошибка'),
+)
+MEDIA_HASH_PATTERN = r'^[0-9a-f]{64}$'
+MEDIA_GZIP_SUFFIX = '.gz'
+MEDIA_GZIP_MAX_RATIO = 0.9
+MEDIA_BASE_URL_ATTRIBUTE = '_media_base_url'
+COMPRESSION_ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/')
+COMPRESSION_BROTLI_MAX_QUALITY = 11
+COMPRESSION_GZIP_MAX_LEVEL = 9
+RESPONSE_CACHE_KEY = 'api-response-{}-{}'
+RESPONSE_CACHE_FORMAT = 'json'
+RESPONSE_CACHE_HEADERS = ('Content-Type', 'Allow', 'Vary')
+RESPONSE_CACHE_VERSION_NAME = 'response-cache'
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from .constants import (
+    EXPORT_FOLDER,
+    EXPORT_FONT_NAME,
+    EXPORT_FORMAT_VERSION,
+    EXPORT_KIND_CHOICES,
+    EXPORT_KIND_FAVORITES,
+    EXPORT_KIND_SHOPPING_CART,
+    EXPORT_STATUS_DONE,
+    EXPORT_STATUS_FAILED,
+    EXPORT_STATUS_RUNNING,
+    TASK_PRIORITY_HIGH,
+)
+from .models import ExportJob, IngredientRecipe, Recipe
+from .storage import export_storage
+from .task_queue import task
+from .utils import get_shopping_cart_ingredients
+
+logger = logging.getLogger('recipes.exports')
+
+
+def get_shopping_cart_data(user):
+    return [
+        [
+            ingredient['ingredient__name'],
+            ingredient['total_amount'],
+            ingredient['ingredient__measurement_unit'],
+        ]
+        for ingredient in get_shopping_cart_ingredients(user)
+    ]
+
+
+def get_favorites_data(user):
+    recipes = list(Recipe.objects.filter(
+        in_favorites__user=user
+    ).order_by('name', 'id').values_list(
+        'id', 'name', 'author__username', 'cooking_time', 'text'
+    ))
+    ingredients = defaultdict(list)
+    for recipe_id, name, amount, measurement_unit in (
+        IngredientRecipe.objects.filter(
+            recipe__in=[recipe[0] for recipe in recipes]
+        ).order_by('ingredient__name').values_list(
+            'recipe_id',
+            'ingredient__name',
+            'amount',
+            'ingredient__measurement_unit',
+        )
+    ):
+        ingredients[recipe_id].append([name, amount, measurement_unit])
+    return [
+        [name, author, cooking_time, text, ingredients[recipe_id]]
+        for recipe_id, name, author, cooking_time, text in recipes
+    ]
+
+
+EXPORT_DATA = {
+    EXPORT_KIND_SHOPPING_CART: get_shopping_cart_data,
+    EXPORT_KIND_FAVORITES: get_favorites_data,
+}
+
+
+def get_content_hash(kind, data):
+    return hashlib.sha256(json.dumps(
+        [EXPORT_FORMAT_VERSION, kind, data],
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()).hexdigest()
+
+
+def get_artifact_name(content_hash):
+    return f'{EXPORT_FOLDER}{content_hash}.pdf'
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    pdfmetrics.registerFont(
+        TTFont(EXPORT_FONT_NAME, settings.EXPORT_FONT_PATH)
+    )
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        style.fontName = EXPORT_FONT_NAME
+    return styles
+
+
+def ingredient_paragraphs(ingredients, styles):
+    return [
+        Paragraph(
+            escape(f'{name}: {amount} {measurement_unit}'),
+            styles['Normal'],
+        )
+        for name, amount, measurement_unit in ingredients
+    ]
+
+
+def shopping_cart_flowables(data, styles):
+    return ingredient_paragraphs(data, styles)
+
+
+def favorites_flowables(data, styles):
+    flowables = []
+    for name, author, cooking_time, text, ingredients in data:
+        if flowables:
+            flowables.append(PageBreak())
+        flowables += [
+            Paragraph(escape(name), styles['Heading2']),
+            Paragraph(escape(f'Автор: {author}'), styles['Italic']),
+            Paragraph(
+                escape(f'Время приготовления: {cooking_time} мин.'),
+                styles['Normal'],
+            ),
+            Paragraph('Ингредиенты', styles['Heading4']),
+            *ingredient_paragraphs(ingredients, styles),
+            Paragraph('Приготовление', styles['Heading4']),
+            *(
+                Paragraph(escape(line), styles['Normal'])
+                for line in text.splitlines() if line.strip()
+            ),
+        ]
+    return flowables
+
+
+EXPORT_FLOWABLES = {
+    EXPORT_KIND_SHOPPING_CART: shopping_cart_flowables,
+    EXPORT_KIND_FAVORITES: favorites_flowables,
+}
+
+
+def render_pdf(kind, data):
+    styles = get_styles()
+    title = dict(EXPORT_KIND_CHOICES)[kind]
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, title=title).build([
+        Paragraph(escape(title), styles['Title']),
+        *EXPORT_FLOWABLES[kind](data, styles),
+    ])
+    return buffer.getvalue()
+
+
+def find_artifact(content_hash):
+    name = get_artifact_name(content_hash)
+    if export_storage.exists(name):
+        return name
+    return None
+
+
+def save_artifact(kind, data, content_hash):
+    return find_artifact(content_hash) or export_storage.save(
+        get_artifact_name(content_hash),
+        ContentFile(render_pdf(kind, data)),
+    )
+
+
+@task(priority=TASK_PRIORITY_HIGH)
+def run_export(job_id):
+    job = ExportJob.objects.select_related('user').get(id=job_id)
+    job.status = EXPORT_STATUS_RUNNING
+    job.save(update_fields=['status'])
+    try:
+        data = EXPORT_DATA[job.kind](job.user)
+        job.content_hash = get_content_hash(job.kind, data)
+        job.file = save_artifact(job.kind, data, job.content_hash)
+        job.status = EXPORT_STATUS_DONE
+    except Exception as error:
+        logger.exception('Export %s failed', job_id)
+        job.status = EXPORT_STATUS_FAILED
+        job.error = str(error)
+    finally:
+        job.finished_at = timezone.now()
+        job.save()
+
+
+def start_export(user, kind):
+    data = EXPORT_DATA[kind](user)
+    content_hash = get_content_hash(kind, data)
+    artifact = find_artifact(content_hash)
+    if artifact:
+        return ExportJob.objects.create(
+            user=user,
+            kind=kind,
+            status=EXPORT_STATUS_DONE,
+            content_hash=content_hash,
+            file=artifact,
+            finished_at=timezone.now(),
+        )
+    job = ExportJob.objects.create(
+        user=user,
+        kind=kind,
+        content_hash=content_hash,
+    )
+    run_export.enqueue(job.id)
+    return job
+
+
+def delete_expired_exports(retention_days):
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    jobs, _ = ExportJob.objects.filter(created_at__lt=cutoff).delete()
+    if not export_storage.exists(EXPORT_FOLDER):
+        return jobs, 0
+    referenced = set(
+        ExportJob.objects.exclude(file='').values_list('file', flat=True)
+    )
+    files = 0
+    for filename in export_storage.listdir(EXPORT_FOLDER)[1]:
+        name = f'{EXPORT_FOLDER}{filename}'
+        if (
+            name not in referenced
+            and export_storage.get_modified_time(name) < cutoff
+        ):
+            export_storage.delete(name)
+            files += 1
+    return jobs, files
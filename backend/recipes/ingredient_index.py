@@ -0,0 +1,142 @@
+from collections import defaultdict
+from threading import Lock, local
+from time import monotonic
+
+from django.conf import settings
+from django.db import transaction
+from pyroaring import BitMap
+
+from backend.db_routers import read_from_primary
+from .constants import (
+    INGREDIENT_INDEX_CHUNK_SIZE,
+    INGREDIENT_INDEX_VERSION_NAME,
+    INGREDIENT_MATCH_ALL,
+    INGREDIENT_MATCH_ANY,
+)
+from .models import IngredientIndexChange, IngredientRecipe
+from .utils import get_cache_version, increment_cache_version
+
+
+def get_version():
+    return get_cache_version(INGREDIENT_INDEX_VERSION_NAME)
+
+
+def at_least(bitmaps, count):
+    levels = [BitMap() for _ in range(count)]
+    for bitmap in bitmaps:
+        for level in range(count - 1, 0, -1):
+            levels[level] |= levels[level - 1] & bitmap
+        levels[0] |= bitmap
+    return levels[-1]
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.bitmaps = {}
+        self.version = None
+        self.built_at = None
+        self.lock = Lock()
+        self.pending = local()
+
+    def build(self):
+        with read_from_primary(), transaction.atomic():
+            version = get_version()
+            recipe_ids = defaultdict(list)
+            for ingredient_id, recipe_id in (
+                IngredientRecipe.objects.values_list(
+                    'ingredient_id', 'recipe_id'
+                ).iterator(chunk_size=INGREDIENT_INDEX_CHUNK_SIZE)
+            ):
+                recipe_ids[ingredient_id].append(recipe_id)
+        self.bitmaps = {
+            ingredient_id: BitMap(ids)
+            for ingredient_id, ids in recipe_ids.items()
+        }
+        self.version = version
+        self.built_at = monotonic()
+
+    def apply(self, recipe_ids, ingredient_recipes):
+        recipe_ids = BitMap(recipe_ids)
+        for bitmap in self.bitmaps.values():
+            bitmap -= recipe_ids
+        for ingredient_id, recipe_id in ingredient_recipes:
+            self.bitmaps.setdefault(ingredient_id, BitMap()).add(recipe_id)
+
+    def reload(self, recipe_ids):
+        self.apply(recipe_ids, IngredientRecipe.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('ingredient_id', 'recipe_id'))
+
+    def sync(self):
+        if (
+            self.version is None
+            or monotonic() - self.built_at
+            > settings.INGREDIENT_INDEX_REBUILD_INTERVAL
+        ):
+            return self.build()
+        with read_from_primary(), transaction.atomic():
+            version = get_version()
+            if version == self.version:
+                return
+            if (
+                version < self.version
+                or version - self.version
+                > settings.INGREDIENT_INDEX_MAX_CHANGES
+            ):
+                return self.build()
+            recipe_ids = IngredientIndexChange.objects.filter(
+                version__gt=self.version,
+                version__lte=version,
+            ).values_list('recipe_id', flat=True)
+            if len(recipe_ids) < version - self.version:
+                return self.build()
+            self.reload(set(recipe_ids))
+        self.version = version
+
+    def update_recipes(self, recipe_ids):
+        recipe_ids = sorted(set(recipe_ids))
+        with self.lock, read_from_primary(), transaction.atomic():
+            version = increment_cache_version(
+                INGREDIENT_INDEX_VERSION_NAME, len(recipe_ids)
+            )
+            first_version = version - len(recipe_ids) + 1
+            IngredientIndexChange.objects.bulk_create(
+                IngredientIndexChange(version=number, recipe_id=recipe_id)
+                for number, recipe_id in enumerate(
+                    recipe_ids, first_version
+                )
+            )
+            IngredientIndexChange.objects.filter(
+                version__lte=version - settings.INGREDIENT_INDEX_MAX_CHANGES
+            ).delete()
+            if self.version != first_version - 1:
+                return
+            self.reload(recipe_ids)
+            self.version = version
+
+    def update_recipe_on_commit(self, recipe_id):
+        recipe_ids = self.pending.__dict__.setdefault('recipe_ids', set())
+        recipe_ids.add(recipe_id)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        recipe_ids = self.pending.__dict__.pop('recipe_ids', None)
+        if recipe_ids:
+            self.update_recipes(recipe_ids)
+
+    def match(self, ingredient_ids, mode):
+        with self.lock:
+            self.sync()
+            bitmaps = [
+                self.bitmaps.get(ingredient_id, BitMap())
+                for ingredient_id in set(ingredient_ids)
+            ]
+            if mode == INGREDIENT_MATCH_ALL:
+                return BitMap.intersection(*bitmaps)
+            if mode == INGREDIENT_MATCH_ANY:
+                return BitMap.union(*bitmaps)
+            return at_least(bitmaps, len(bitmaps) // 2 + 1)
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.constants import FEED_BACKFILL_LIMIT, FEED_BATCH_SIZE
+from recipes.models import Recipe, Subscribe, TimelineEntry
+from recipes.utils import get_popular_author_ids
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет ленты подписок последними рецептами авторов, '
+        'на которых подписаны пользователи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-author',
+            type=int,
+            default=FEED_BACKFILL_LIMIT,
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить все записи лент перед заполнением.',
+        )
+
+    def handle(self, *args, per_author, clear, **options):
+        started = time.perf_counter()
+        if clear:
+            TimelineEntry.objects.all().delete()
+        count_before = TimelineEntry.objects.count()
+        popular_author_ids = get_popular_author_ids()
+        author_ids = Subscribe.objects.exclude(
+            subscribed_user_id__in=popular_author_ids
+        ).values_list('subscribed_user_id', flat=True).distinct()
+        authors = 0
+        for author_id in author_ids.iterator():
+            recipes = list(Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-pub_date').values_list('id', 'pub_date')[
+                :per_author
+            ])
+            if not recipes:
+                continue
+            follower_ids = Subscribe.objects.filter(
+                subscribed_user_id=author_id
+            ).values_list('user_id', flat=True)
+            TimelineEntry.objects.bulk_create(
+                (
+                    TimelineEntry(
+                        user_id=user_id,
+                        recipe_id=recipe_id,
+                        pub_date=pub_date,
+                    )
+                    for user_id in follower_ids
+                    for recipe_id, pub_date in recipes
+                ),
+                batch_size=FEED_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            authors += 1
+        elapsed = time.perf_counter() - started
+        entries = TimelineEntry.objects.count() - count_before
+        self.stdout.write(self.style.SUCCESS(
+            f'Авторов: {authors}, добавлено записей лент: {entries}, '
+            f'популярных авторов без рассылки: {len(popular_author_ids)}. '
+            f'{elapsed:.2f} с, {entries / max(elapsed, 1e-9):.0f} записей/с.'
+        ))
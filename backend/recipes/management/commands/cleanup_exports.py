@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.exports import delete_expired_exports
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет выгрузки старше срока хранения и PDF-файлы, на которые '
+        'больше не ссылается ни одна выгрузка.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.EXPORT_RETENTION_DAYS,
+        )
+
+    def handle(self, *args, days, **options):
+        started = time.perf_counter()
+        jobs, files = delete_expired_exports(days)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено выгрузок: {jobs}, файлов: {files}. {elapsed:.2f} с.'
+        ))
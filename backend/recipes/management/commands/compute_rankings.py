@@ -0,0 +1,96 @@
+import math
+import time
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from recipes.constants import (
+    RANKING_BATCH_SIZE,
+    RANKING_FAVORITE_WEIGHT,
+    RANKING_SHOPPING_CART_WEIGHT,
+)
+from recipes.models import Favorite, Recipe, RecipeRanking, ShoppingCart
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги рецептов по добавлениям в избранное и '
+        'списки покупок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--half-life-hours',
+            type=float,
+            default=settings.RANKING_TRENDING_HALF_LIFE_HOURS,
+        )
+        parser.add_argument(
+            '--window-days',
+            type=int,
+            default=settings.RANKING_TRENDING_WINDOW_DAYS,
+        )
+
+    def handle(self, *args, half_life_hours, window_days, **options):
+        started = time.perf_counter()
+        now = timezone.now()
+        since = now - timedelta(days=window_days)
+        decay = math.log(2) / (half_life_hours * 3600)
+        popularity = defaultdict(float)
+        trending = defaultdict(float)
+        for model, weight in (
+            (Favorite, RANKING_FAVORITE_WEIGHT),
+            (ShoppingCart, RANKING_SHOPPING_CART_WEIGHT),
+        ):
+            for recipe_id, count in model.objects.values('recipe').annotate(
+                count=Count('id')
+            ).values_list('recipe', 'count').iterator():
+                popularity[recipe_id] += weight * count
+            for recipe_id, created_at in model.objects.filter(
+                created_at__gte=since
+            ).values_list('recipe_id', 'created_at').iterator(
+                chunk_size=RANKING_BATCH_SIZE
+            ):
+                trending[recipe_id] += weight * math.exp(
+                    -decay * (now - created_at).total_seconds()
+                )
+        recipe_ids = set(popularity) | set(trending) | set(
+            RecipeRanking.objects.filter(
+                Q(popularity__gt=0) | Q(trending__gt=0)
+            ).values_list('recipe_id', flat=True)
+        )
+        updated = self.bulk_upsert(
+            RecipeRanking(
+                recipe_id=recipe_id,
+                popularity=popularity.get(recipe_id, 0),
+                trending=trending.get(recipe_id, 0),
+            )
+            for recipe_id in sorted(recipe_ids)
+        )
+        created = self.bulk_upsert(
+            RecipeRanking(recipe_id=recipe_id)
+            for recipe_id in list(Recipe.objects.filter(
+                ranking__isnull=True
+            ).values_list('id', flat=True))
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено рейтингов: {updated}, добавлено: {created}. '
+            f'{elapsed:.2f} с.'
+        ))
+
+    def bulk_upsert(self, rankings):
+        count = 0
+        while batch := list(islice(rankings, RANKING_BATCH_SIZE)):
+            RecipeRanking.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['recipe'],
+                update_fields=['popularity', 'trending'],
+            )
+            count += len(batch)
+        return count
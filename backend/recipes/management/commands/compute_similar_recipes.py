@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min
+
+from recipes.constants import SIMILAR_BATCH_SIZE, SIMILAR_RECIPES_LIMIT
+from recipes.models import SimilarRecipe, StaleSimilarRecipe
+from recipes.similarity import RecipeFeatures, find_rows
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие рецепты по общим ингредиентам и тегам: '
+        'полностью или только для изменившихся рецептов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать похожие рецепты для всех рецептов.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=SIMILAR_RECIPES_LIMIT,
+        )
+
+    def handle(self, *args, full, limit, **options):
+        started = time.perf_counter()
+        full = full or not SimilarRecipe.objects.exists()
+        stale_ids = list(StaleSimilarRecipe.objects.values_list(
+            'recipe_id', flat=True
+        ))
+        if not full and not stale_ids:
+            self.stdout.write('Изменившихся рецептов нет.')
+            return
+        features = RecipeFeatures()
+        if full:
+            rows = np.arange(len(features.recipe_ids))
+        else:
+            rows = self.get_affected_rows(features, stale_ids, limit)
+        with transaction.atomic():
+            if full:
+                SimilarRecipe.objects.all().delete()
+            created = 0
+            for batch in chunks(rows, features.batch_size):
+                recipe_ids, similar_ids, scores = features.get_top(
+                    batch, limit
+                )
+                if not full:
+                    SimilarRecipe.objects.filter(
+                        recipe_id__in=features.recipe_ids[batch].tolist()
+                    ).delete()
+                created += len(SimilarRecipe.objects.bulk_create(
+                    SimilarRecipe(
+                        recipe_id=recipe_id,
+                        similar_id=similar_id,
+                        score=score,
+                    )
+                    for recipe_id, similar_id, score in zip(
+                        recipe_ids.tolist(),
+                        similar_ids.tolist(),
+                        scores.tolist(),
+                    )
+                ))
+            for batch in chunks(stale_ids, SIMILAR_BATCH_SIZE):
+                StaleSimilarRecipe.objects.filter(
+                    recipe_id__in=batch
+                ).delete()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецептов: {len(features.recipe_ids)}, пересчитано: '
+            f'{len(rows)}, записей о похожих рецептах: {created}. '
+            f'{elapsed:.2f} с.'
+        ))
+
+    def get_affected_rows(self, features, stale_ids, limit):
+        affected_ids = set(stale_ids)
+        for batch in chunks(stale_ids, SIMILAR_BATCH_SIZE):
+            affected_ids.update(SimilarRecipe.objects.filter(
+                similar_id__in=batch
+            ).values_list('recipe_id', flat=True))
+        thresholds = np.zeros(len(features.recipe_ids))
+        lists = SimilarRecipe.objects.values('recipe').annotate(
+            count=Count('id'),
+            lowest=Min('score'),
+        ).filter(count__gte=limit).values_list('recipe', 'lowest')
+        if lists:
+            recipe_ids, lowest = np.array(list(lists)).T
+            rows, found = find_rows(
+                features.recipe_ids, recipe_ids.astype(np.int64)
+            )
+            thresholds[rows[found]] = lowest[found]
+        for batch in chunks(features.get_rows(stale_ids), features.batch_size):
+            scores = features.get_scores(batch)
+            _, columns = np.nonzero((scores > 0) & (scores > thresholds))
+            affected_ids.update(features.recipe_ids[columns].tolist())
+        return features.get_rows(affected_ids)
@@ -0,0 +1,49 @@
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.constants import MEDIA_HASH_PATTERN
+from recipes.models import Recipe, User
+from recipes.storage import content_hash_storage
+
+MEDIA_HASH = re.compile(MEDIA_HASH_PATTERN)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переименовывает загруженные картинки рецептов и аватары по хешу '
+        'содержимого.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        renamed = []
+        missing = 0
+        for model, field in ((Recipe, 'image'), (User, 'avatar')):
+            for name in model.objects.exclude(
+                **{f'{field}__isnull': True}
+            ).exclude(
+                **{field: ''}
+            ).order_by().values_list(field, flat=True).distinct():
+                if MEDIA_HASH.match(
+                    os.path.splitext(os.path.basename(name))[0]
+                ):
+                    continue
+                if not content_hash_storage.exists(name):
+                    missing += 1
+                    continue
+                with content_hash_storage.open(name) as file:
+                    new_name = content_hash_storage.save(name, file)
+                model.objects.filter(**{field: name}).update(
+                    **{field: new_name}
+                )
+                renamed.append(name)
+        for name in renamed:
+            content_hash_storage.delete(name)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Переименовано файлов: {len(renamed)}, не найдено: {missing}. '
+            f'{elapsed:.2f} с.'
+        ))
@@ -0,0 +1,89 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.constants import INGREDIENTS_BATCH_SIZE
+from recipes.models import Ingredient
+from recipes.utils import invalidate_response_cache
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def read_json(file):
+    for item in json.load(file):
+        yield item['name'], item['measurement_unit']
+
+
+def read_json_lines(file):
+    for line in file:
+        if line.strip():
+            item = json.loads(line)
+            yield item['name'], item['measurement_unit']
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+    '.jsonl': read_json_lines,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV, JSON или JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=INGREDIENTS_BATCH_SIZE,
+        )
+
+    def handle(self, *args, path, batch_size, **options):
+        reader = READERS.get(path.suffix.lower())
+        if reader is None:
+            raise CommandError(
+                f'Неподдерживаемый формат файла: {path.suffix}.'
+            )
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден.')
+        count_before = Ingredient.objects.count()
+        rows = 0
+        started = time.perf_counter()
+        with path.open(encoding='utf-8', newline='') as file:
+            ingredients = (
+                Ingredient(
+                    name=name.strip(),
+                    measurement_unit=measurement_unit.strip(),
+                )
+                for name, measurement_unit in reader(file)
+                if name.strip() and measurement_unit.strip()
+            )
+            try:
+                while batch := list(islice(ingredients, batch_size)):
+                    Ingredient.objects.bulk_create(
+                        batch,
+                        batch_size=batch_size,
+                        ignore_conflicts=True,
+                    )
+                    rows += len(batch)
+            except (KeyError, TypeError, ValueError) as error:
+                raise CommandError(
+                    f'Некорректная запись после строки {rows}: {error!r}.'
+                )
+        invalidate_response_cache()
+        elapsed = time.perf_counter() - started
+        created = Ingredient.objects.count() - count_before
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано {rows}, добавлено {created}, '
+            f'пропущено повторов {rows - created}. '
+            f'{elapsed:.2f} с, {rows / max(elapsed, 1e-9):.0f} строк/с.'
+        ))
@@ -0,0 +1,82 @@
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Event
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes.task_queue import claim_tasks, run_task
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди в базе данных пулом '
+        'потоков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.TASK_WORKER_CONCURRENCY,
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.TASK_POLL_INTERVAL,
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+
+    def handle(self, *args, concurrency, poll_interval, burst, **options):
+        started = time.perf_counter()
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(
+                signal_number, lambda *args: stopping.set()
+            )
+        running = set()
+        results = []
+        with ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix='task',
+        ) as executor:
+            while True:
+                tasks = []
+                if not stopping.is_set() and len(running) < concurrency:
+                    tasks = claim_tasks(worker, concurrency - len(running))
+                    running.update(
+                        executor.submit(run_task, task) for task in tasks
+                    )
+                if not running:
+                    if burst or stopping.is_set():
+                        break
+                    stopping.wait(poll_interval)
+                    continue
+                if len(running) >= concurrency or stopping.is_set():
+                    timeout = None
+                elif tasks:
+                    timeout = 0
+                else:
+                    timeout = poll_interval
+                done, running = wait(
+                    running,
+                    timeout=timeout,
+                    return_when=FIRST_COMPLETED,
+                )
+                results.extend(future.result() for future in done)
+        connections.close_all()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {results.count(True)}, '
+            f'с ошибкой: {results.count(False)}. '
+            f'{elapsed:.2f} с.'
+        ))
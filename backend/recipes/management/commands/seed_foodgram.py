@@ -0,0 +1,243 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from recipes.constants import (
+    SEED_ACTIVITY_DAYS,
+    SEED_BATCH_SIZE,
+    SEED_EMAIL_DOMAIN,
+    SEED_PASSWORD,
+    SEED_RECIPE_IMAGE,
+    SEED_TAGS,
+    SEED_USERNAME_PREFIX,
+)
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Subscribe,
+    Tag,
+    User,
+)
+
+
+def zipf_index(rng, size):
+    return min(int((size + 1) ** rng.random()) - 1, size - 1)
+
+
+def zipf_sample(rng, items, count):
+    count = min(count, len(items))
+    sample = set()
+    while len(sample) < count:
+        sample.add(items[zipf_index(rng, len(items))])
+    return sample
+
+
+def pick_count(rng, average, limit):
+    return min(int(rng.expovariate(1 / average)) if average else 0, limit)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт воспроизводимый набор пользователей, рецептов, подписок, '
+        'избранного и списков покупок для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--favorites', type=float, default=20)
+        parser.add_argument('--shopping-carts', type=float, default=3)
+        parser.add_argument('--subscriptions', type=float, default=10)
+        parser.add_argument('--min-ingredients', type=int, default=3)
+        parser.add_argument('--max-ingredients', type=int, default=12)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SEED_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить ранее созданные данные перед генерацией.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        seed_users = User.objects.filter(
+            username__startswith=SEED_USERNAME_PREFIX
+        )
+        if options['clear']:
+            seed_users.delete()
+        elif seed_users.exists():
+            raise CommandError(
+                'Сгенерированные данные уже есть в базе. '
+                'Запустите команду с --clear.'
+            )
+        ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                'Сначала загрузите ингредиенты командой load_ingredients.'
+            )
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        self.rng.shuffle(ingredient_ids)
+        tag_ids = self.get_tag_ids()
+        user_ids = self.timed('Пользователи', self.create_users, options)
+        recipe_ids = self.timed(
+            'Рецепты',
+            self.create_recipes,
+            options,
+            user_ids,
+            ingredient_ids,
+            tag_ids,
+        )
+        self.rng.shuffle(recipe_ids)
+        self.timed(
+            'Подписки',
+            self.create_subscriptions,
+            options['subscriptions'],
+            user_ids,
+        )
+        self.timed(
+            'Избранное',
+            self.create_user_recipes,
+            Favorite,
+            options['favorites'],
+            user_ids,
+            recipe_ids,
+        )
+        self.timed(
+            'Списки покупок',
+            self.create_user_recipes,
+            ShoppingCart,
+            options['shopping_carts'],
+            user_ids,
+            recipe_ids,
+        )
+
+    def timed(self, title, create, *args):
+        started = time.perf_counter()
+        result = create(*args)
+        elapsed = time.perf_counter() - started
+        count = result if isinstance(result, int) else len(result)
+        self.stdout.write(
+            f'{title}: {count} за {elapsed:.2f} с '
+            f'({count / max(elapsed, 1e-9):.0f} в секунду).'
+        )
+        return result
+
+    def bulk_create(self, model, objects):
+        created = []
+        while batch := list(islice(objects, self.batch_size)):
+            created.extend(model.objects.bulk_create(batch))
+        return created
+
+    def get_tag_ids(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, slug=slug) for name, slug in SEED_TAGS
+            )
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def create_users(self, options):
+        password = make_password(SEED_PASSWORD)
+        users = self.bulk_create(User, (
+            User(
+                username=f'{SEED_USERNAME_PREFIX}{number}',
+                email=f'{SEED_USERNAME_PREFIX}{number}@{SEED_EMAIL_DOMAIN}',
+                first_name='Пользователь',
+                last_name=str(number),
+                password=password,
+            )
+            for number in range(options['users'])
+        ))
+        user_ids = [user.id for user in users]
+        self.rng.shuffle(user_ids)
+        return user_ids
+
+    def create_recipes(self, options, user_ids, ingredient_ids, tag_ids):
+        recipe_ids = []
+        numbers = iter(range(options['recipes']))
+        while batch := list(islice(numbers, self.batch_size)):
+            recipes = Recipe.objects.bulk_create(
+                Recipe(
+                    author_id=user_ids[zipf_index(self.rng, len(user_ids))],
+                    name=f'Рецепт {number}',
+                    text='Сгенерированный рецепт.',
+                    image=SEED_RECIPE_IMAGE,
+                    cooking_time=self.rng.randint(1, 180),
+                )
+                for number in batch
+            )
+            recipe_ingredients = []
+            recipe_tags = []
+            for recipe in recipes:
+                recipe_ids.append(recipe.id)
+                for ingredient_id in zipf_sample(
+                    self.rng,
+                    ingredient_ids,
+                    self.rng.randint(
+                        options['min_ingredients'],
+                        options['max_ingredients'],
+                    ),
+                ):
+                    recipe_ingredients.append(IngredientRecipe(
+                        recipe_id=recipe.id,
+                        ingredient_id=ingredient_id,
+                        amount=self.rng.randint(1, 500),
+                    ))
+                for tag_id in zipf_sample(
+                    self.rng, tag_ids, self.rng.randint(1, 3)
+                ):
+                    recipe_tags.append(Recipe.tags.through(
+                        recipe_id=recipe.id,
+                        tag_id=tag_id,
+                    ))
+            IngredientRecipe.objects.bulk_create(recipe_ingredients)
+            Recipe.tags.through.objects.bulk_create(recipe_tags)
+        return recipe_ids
+
+    def create_subscriptions(self, average, user_ids):
+        def subscriptions():
+            for user_id in user_ids:
+                count = pick_count(self.rng, average, len(user_ids) - 1)
+                subscribed_user_ids = zipf_sample(
+                    self.rng, user_ids, count + 1
+                ) - {user_id}
+                for subscribed_user_id in list(subscribed_user_ids)[:count]:
+                    yield Subscribe(
+                        user_id=user_id,
+                        subscribed_user_id=subscribed_user_id,
+                    )
+
+        return len(self.bulk_create(Subscribe, subscriptions()))
+
+    def create_user_recipes(self, model, average, user_ids, recipe_ids):
+        now = timezone.now()
+        activity_seconds = timedelta(days=SEED_ACTIVITY_DAYS).total_seconds()
+
+        def user_recipes():
+            for user_id in user_ids:
+                count = pick_count(self.rng, average, len(recipe_ids))
+                for recipe_id in zipf_sample(self.rng, recipe_ids, count):
+                    yield model(
+                        user_id=user_id,
+                        recipe_id=recipe_id,
+                        created_at=now - timedelta(
+                            seconds=self.rng.uniform(0, activity_seconds)
+                        ),
+                    )
+
+        return len(self.bulk_create(model, user_recipes()))
@@ -0,0 +1,243 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    """
+    CREATE FUNCTION recipes_recipe_search_vector(
+        recipe_id bigint, recipe_name text, recipe_text text
+    ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT
+            setweight(to_tsvector('russian', coalesce(recipe_name, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce((
+                SELECT string_agg(ingredient.name, ' ')
+                FROM recipes_ingredientrecipe AS amount
+                JOIN recipes_ingredient AS ingredient
+                    ON ingredient.id = amount.ingredient_id
+                WHERE amount.recipe_id = $1
+            ), '')), 'B')
+            || setweight(to_tsvector('russian', coalesce(recipe_text, '')), 'C')
+    $$
+    """,
+    'ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION recipes_recipe_search_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := recipes_recipe_search_vector(
+            NEW.id, NEW.name, NEW.text
+        );
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_update
+    BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_update()
+    """,
+    """
+    CREATE FUNCTION recipes_ingredientrecipe_search_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE recipes_recipe
+            SET search_vector = recipes_recipe_search_vector(id, name, text)
+            WHERE id IN (SELECT recipe_id FROM new_rows);
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE recipes_recipe
+            SET search_vector = recipes_recipe_search_vector(id, name, text)
+            WHERE id IN (SELECT recipe_id FROM old_rows);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER recipes_ingredientrecipe_search_insert
+    AFTER INSERT ON recipes_ingredientrecipe
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_ingredientrecipe_search_update()
+    """,
+    """
+    CREATE TRIGGER recipes_ingredientrecipe_search_update
+    AFTER UPDATE ON recipes_ingredientrecipe
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_ingredientrecipe_search_update()
+    """,
+    """
+    CREATE TRIGGER recipes_ingredientrecipe_search_delete
+    AFTER DELETE ON recipes_ingredientrecipe
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_ingredientrecipe_search_update()
+    """,
+    """
+    CREATE FUNCTION recipes_ingredient_search_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE recipes_recipe
+        SET search_vector = recipes_recipe_search_vector(id, name, text)
+        WHERE id IN (
+            SELECT recipe_id FROM recipes_ingredientrecipe
+            WHERE ingredient_id = NEW.id
+        );
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER recipes_ingredient_search_update
+    AFTER UPDATE OF name ON recipes_ingredient
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION recipes_ingredient_search_update()
+    """,
+    """
+    UPDATE recipes_recipe
+    SET search_vector = recipes_recipe_search_vector(id, name, text)
+    """,
+    """
+    CREATE INDEX recipe_search_vector_idx
+    ON recipes_recipe USING gin (search_vector)
+    """,
+)
+
+POSTGRESQL_BACKWARD = (
+    'DROP TRIGGER recipes_ingredient_search_update ON recipes_ingredient',
+    'DROP FUNCTION recipes_ingredient_search_update()',
+    'DROP TRIGGER recipes_ingredientrecipe_search_delete '
+    'ON recipes_ingredientrecipe',
+    'DROP TRIGGER recipes_ingredientrecipe_search_update '
+    'ON recipes_ingredientrecipe',
+    'DROP TRIGGER recipes_ingredientrecipe_search_insert '
+    'ON recipes_ingredientrecipe',
+    'DROP FUNCTION recipes_ingredientrecipe_search_update()',
+    'DROP TRIGGER recipes_recipe_search_update ON recipes_recipe',
+    'DROP FUNCTION recipes_recipe_search_update()',
+    'ALTER TABLE recipes_recipe DROP COLUMN search_vector',
+    'DROP FUNCTION recipes_recipe_search_vector(bigint, text, text)',
+)
+
+SQLITE_INGREDIENTS = """
+    SELECT group_concat(ingredient.name, ' ')
+    FROM recipes_ingredientrecipe AS amount
+    JOIN recipes_ingredient AS ingredient
+        ON ingredient.id = amount.ingredient_id
+    WHERE amount.recipe_id = {recipe_id}
+"""
+
+SQLITE_UPDATE_INGREDIENTS = f"""
+    UPDATE recipes_recipe_search
+    SET ingredients = coalesce(({SQLITE_INGREDIENTS}), '')
+    WHERE rowid = {{recipe_id}};
+"""
+
+SQLITE_FORWARD = (
+    """
+    CREATE VIRTUAL TABLE recipes_recipe_search
+    USING fts5(name, ingredients, text)
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_insert
+    AFTER INSERT ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_search (rowid, name, ingredients, text)
+        VALUES (NEW.id, NEW.name, '', NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_update
+    AFTER UPDATE OF name, text ON recipes_recipe BEGIN
+        UPDATE recipes_recipe_search
+        SET name = NEW.name, text = NEW.text
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_delete
+    AFTER DELETE ON recipes_recipe BEGIN
+        DELETE FROM recipes_recipe_search WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipes_ingredientrecipe_search_insert
+    AFTER INSERT ON recipes_ingredientrecipe BEGIN
+        {SQLITE_UPDATE_INGREDIENTS.format(recipe_id='NEW.recipe_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipes_ingredientrecipe_search_update
+    AFTER UPDATE ON recipes_ingredientrecipe BEGIN
+        {SQLITE_UPDATE_INGREDIENTS.format(recipe_id='OLD.recipe_id')}
+        {SQLITE_UPDATE_INGREDIENTS.format(recipe_id='NEW.recipe_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipes_ingredientrecipe_search_delete
+    AFTER DELETE ON recipes_ingredientrecipe BEGIN
+        {SQLITE_UPDATE_INGREDIENTS.format(recipe_id='OLD.recipe_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipes_ingredient_search_update
+    AFTER UPDATE OF name ON recipes_ingredient BEGIN
+        UPDATE recipes_recipe_search
+        SET ingredients = coalesce((
+            {SQLITE_INGREDIENTS.format(recipe_id='recipes_recipe_search.rowid')}
+        ), '')
+        WHERE rowid IN (
+            SELECT recipe_id FROM recipes_ingredientrecipe
+            WHERE ingredient_id = NEW.id
+        );
+    END
+    """,
+    f"""
+    INSERT INTO recipes_recipe_search (rowid, name, ingredients, text)
+    SELECT
+        recipe.id,
+        recipe.name,
+        coalesce(({SQLITE_INGREDIENTS.format(recipe_id='recipe.id')}), ''),
+        recipe.text
+    FROM recipes_recipe AS recipe
+    """,
+)
+
+SQLITE_BACKWARD = (
+    'DROP TRIGGER recipes_ingredient_search_update',
+    'DROP TRIGGER recipes_ingredientrecipe_search_delete',
+    'DROP TRIGGER recipes_ingredientrecipe_search_update',
+    'DROP TRIGGER recipes_ingredientrecipe_search_insert',
+    'DROP TRIGGER recipes_recipe_search_delete',
+    'DROP TRIGGER recipes_recipe_search_update',
+    'DROP TRIGGER recipes_recipe_search_insert',
+    'DROP TABLE recipes_recipe_search',
+)
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def execute(schema_editor, direction):
+    forward_backward = STATEMENTS.get(schema_editor.connection.vendor)
+    if forward_backward is None:
+        return
+    for statement in forward_backward[direction]:
+        schema_editor.execute(statement, params=None)
+
+
+def create_search(apps, schema_editor):
+    execute(schema_editor, 0)
+
+
+def drop_search(apps, schema_editor):
+    execute(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_timelineentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:20
+
+from django.db import migrations, models
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_task'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=recipes.storage.ContentHashStorage(), upload_to='recipes/images/', verbose_name='Картинка'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(default='', null=True, storage=recipes.storage.ContentHashStorage(), upload_to='users/images/', verbose_name='Аватар'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+SQLITE_INGREDIENTS = """
+    SELECT group_concat(ingredient.name, ' ')
+    FROM recipes_ingredientrecipe AS amount
+    JOIN recipes_ingredient AS ingredient
+        ON ingredient.id = amount.ingredient_id
+    WHERE amount.recipe_id = recipe.id
+"""
+
+SQLITE_FORWARD = (
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_insert',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_update',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_delete',
+    """
+    CREATE TRIGGER recipes_recipe_search_insert
+    AFTER INSERT ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_search (rowid, name, ingredients, text)
+        VALUES (NEW.id, NEW.name, '', NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_update
+    AFTER UPDATE OF name, text ON recipes_recipe BEGIN
+        UPDATE recipes_recipe_search
+        SET name = NEW.name, text = NEW.text
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_recipe_search_delete
+    AFTER DELETE ON recipes_recipe BEGIN
+        DELETE FROM recipes_recipe_search WHERE rowid = OLD.id;
+    END
+    """,
+    'DELETE FROM recipes_recipe_search',
+    f"""
+    INSERT INTO recipes_recipe_search (rowid, name, ingredients, text)
+    SELECT
+        recipe.id,
+        recipe.name,
+        coalesce(({SQLITE_INGREDIENTS}), ''),
+        recipe.text
+    FROM recipes_recipe AS recipe
+    """,
+)
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SQLITE_FORWARD:
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_content_hash_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            restore_search_triggers, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_restore_recipe_search_triggers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Название')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия кэша',
+                'verbose_name_plural': 'Версии кэшей',
+            },
+        ),
+        migrations.CreateModel(
+            name='IngredientIndexChange',
+            fields=[
+                ('version', models.PositiveBigIntegerField(primary_key=True, serialize=False, verbose_name='Версия')),
+                ('recipe_id', models.BigIntegerField(verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Изменение индекса ингредиентов',
+                'verbose_name_plural': 'Изменения индекса ингредиентов',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:45
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+import recipes.storage
+
+
+def move_exports(apps, schema_editor):
+    ExportJob = apps.get_model('recipes', 'ExportJob')
+    storage = recipes.storage.export_storage
+    for name in set(ExportJob.objects.exclude(
+        file=''
+    ).values_list('file', flat=True)):
+        if not default_storage.exists(name):
+            continue
+        if not storage.exists(name):
+            with default_storage.open(name, 'rb') as file:
+                storage.save(name, file)
+        default_storage.delete(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_cache_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=recipes.storage.ExportStorage(), upload_to='exports/', verbose_name='Файл'),
+        ),
+        migrations.RunPython(move_exports, migrations.RunPython.noop),
+    ]
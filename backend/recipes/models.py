@@ -4,10 +4,18 @@ from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
+from django.utils import timezone
 
 from .constants import (
     AVATAR_IMAGE_FOLDER,
+    CACHE_VERSION_NAME_MAX_LENGTH,
     EMAIL_MAX_LENGTH,
+    EXPORT_CHOICE_MAX_LENGTH,
+    EXPORT_FOLDER,
+    EXPORT_HASH_MAX_LENGTH,
+    EXPORT_KIND_CHOICES,
+    EXPORT_STATUS_CHOICES,
+    EXPORT_STATUS_PENDING,
     MEASUREMENT_UNIT_MAX_LENGTH,
     MIN_COOKING_TIME,
     MIN_INGREDIENT_AMOUNT,
@@ -16,8 +24,16 @@ from .constants import (
     RECIPE_IMAGE_FOLDER,
     SHORT_LINK_MAX_LENGTH,
     TAG_SLUG_MAX_LENGTH,
+    TASK_NAME_MAX_LENGTH,
+    TASK_PRIORITY_DEFAULT,
+    TASK_STATUS_CHOICES,
+    TASK_STATUS_FAILED,
+    TASK_STATUS_MAX_LENGTH,
+    TASK_STATUS_QUEUED,
+    TASK_WORKER_MAX_LENGTH,
     USERNAME_STR_WIDTH,
 )
+from .storage import content_hash_storage, export_storage
 
 
 class User(AbstractUser):
@@ -45,6 +61,7 @@ class User(AbstractUser):
     )
     avatar = models.ImageField(
         upload_to=AVATAR_IMAGE_FOLDER,
+        storage=content_hash_storage,
         null=True,
         default='',
         verbose_name='Аватар'
@@ -120,6 +137,7 @@ class Recipe(NameModel):
     )
     image = models.ImageField(
         upload_to=RECIPE_IMAGE_FOLDER,
+        storage=content_hash_storage,
         verbose_name='Картинка'
     )
     text = models.TextField(verbose_name='Описание')
@@ -146,6 +164,12 @@ class Recipe(NameModel):
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
         default_related_name = 'recipes'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_idx'
+            ),
+        ]
 
 
 class IngredientRecipe(models.Model):
@@ -260,6 +284,10 @@ class Favorite(models.Model):
         related_name='favorites',
         verbose_name='Пользователь'
     )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата добавления'
+    )
 
     class Meta:
         verbose_name = 'Избранное'
@@ -270,6 +298,12 @@ class Favorite(models.Model):
                 name='unique_favorite'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='favorite_created_at_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -292,6 +326,10 @@ class ShoppingCart(models.Model):
         related_name='shopping_cart',
         verbose_name='Пользователь'
     )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата добавления'
+    )
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -302,9 +340,297 @@ class ShoppingCart(models.Model):
                 name='unique_shopping_cart'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='shopping_cart_created_at_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
             f'Пользователь - {self.user}. '
             f'Рецепт - {self.recipe}.'
         )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-recipe_id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-recipe'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'Читатель - {self.user}. '
+            f'Рецепт - {self.recipe}.'
+        )
+
+
+class RecipeRanking(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='Рецепт'
+    )
+    popularity = models.FloatField(
+        default=0,
+        verbose_name='Популярность'
+    )
+    trending = models.FloatField(
+        default=0,
+        verbose_name='Популярность за последнее время'
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+        indexes = [
+            models.Index(
+                fields=['-popularity', '-recipe'],
+                name='ranking_popularity_idx'
+            ),
+            models.Index(
+                fields=['-trending', '-recipe'],
+                name='ranking_trending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Рецепт - {self.recipe}.'
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='similar_recipes',
+        verbose_name='Рецепт'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name='Похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'],
+                name='unique_similar_recipe'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['recipe', '-score'],
+                name='similar_recipe_score_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'Рецепт - {self.recipe}. '
+            f'Похожий рецепт - {self.similar}.'
+        )
+
+
+class StaleSimilarRecipe(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        verbose_name='Рецепт'
+    )
+
+    class Meta:
+        verbose_name = 'Рецепт для пересчёта похожих'
+        verbose_name_plural = 'Рецепты для пересчёта похожих'
+
+    def __str__(self):
+        return f'Рецепт - {self.recipe}.'
+
+
+class ExportJob(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='exports',
+        verbose_name='Пользователь'
+    )
+    kind = models.CharField(
+        max_length=EXPORT_CHOICE_MAX_LENGTH,
+        choices=EXPORT_KIND_CHOICES,
+        verbose_name='Тип'
+    )
+    status = models.CharField(
+        max_length=EXPORT_CHOICE_MAX_LENGTH,
+        choices=EXPORT_STATUS_CHOICES,
+        default=EXPORT_STATUS_PENDING,
+        verbose_name='Статус'
+    )
+    content_hash = models.CharField(
+        max_length=EXPORT_HASH_MAX_LENGTH,
+        blank=True,
+        verbose_name='Хеш содержимого'
+    )
+    file = models.FileField(
+        upload_to=EXPORT_FOLDER,
+        storage=export_storage,
+        blank=True,
+        verbose_name='Файл'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата создания'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата завершения'
+    )
+
+    class Meta:
+        ordering = ('-created_at',)
+        verbose_name = 'Экспорт'
+        verbose_name_plural = 'Экспорты'
+
+    def __str__(self):
+        return (
+            f'Пользователь - {self.user}. '
+            f'Экспорт - {self.get_kind_display()}.'
+        )
+
+
+class Task(models.Model):
+    name = models.CharField(
+        max_length=TASK_NAME_MAX_LENGTH,
+        verbose_name='Задача'
+    )
+    args = models.JSONField(
+        default=list,
+        verbose_name='Аргументы'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name='Именованные аргументы'
+    )
+    priority = models.SmallIntegerField(
+        default=TASK_PRIORITY_DEFAULT,
+        verbose_name='Приоритет'
+    )
+    status = models.CharField(
+        max_length=TASK_STATUS_MAX_LENGTH,
+        choices=TASK_STATUS_CHOICES,
+        default=TASK_STATUS_QUEUED,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток'
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Доступна с'
+    )
+    locked_by = models.CharField(
+        max_length=TASK_WORKER_MAX_LENGTH,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['-priority', 'available_at'],
+                condition=~models.Q(status=TASK_STATUS_FAILED),
+                name='task_claim_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Задача - {self.name}. Статус - {self.get_status_display()}.'
+
+
+class CacheVersion(models.Model):
+    name = models.CharField(
+        max_length=CACHE_VERSION_NAME_MAX_LENGTH,
+        primary_key=True,
+        verbose_name='Название'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия'
+    )
+
+    class Meta:
+        verbose_name = 'Версия кэша'
+        verbose_name_plural = 'Версии кэшей'
+
+    def __str__(self):
+        return f'Кэш - {self.name}. Версия - {self.version}.'
+
+
+class IngredientIndexChange(models.Model):
+    version = models.PositiveBigIntegerField(
+        primary_key=True,
+        verbose_name='Версия'
+    )
+    recipe_id = models.BigIntegerField(verbose_name='Рецепт')
+
+    class Meta:
+        verbose_name = 'Изменение индекса ингредиентов'
+        verbose_name_plural = 'Изменения индекса ингредиентов'
+
+    def __str__(self):
+        return f'Версия - {self.version}. Рецепт - {self.recipe_id}.'
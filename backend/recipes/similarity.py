@@ -0,0 +1,106 @@
+import numpy as np
+from scipy import sparse
+
+from .constants import SIMILAR_BATCH_CELLS, SIMILAR_TAG_WEIGHT
+from .models import IngredientRecipe, Recipe
+
+
+def get_idf(matrix):
+    return np.log((1 + matrix.shape[0]) / (1 + matrix.getnnz(axis=0))) + 1
+
+
+def find_rows(recipe_ids, ids):
+    rows = np.searchsorted(recipe_ids, ids)
+    found = rows < len(recipe_ids)
+    found[found] = recipe_ids[rows[found]] == ids[found]
+    return rows, found
+
+
+def to_matrix(pairs, recipe_ids):
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    rows, found = find_rows(recipe_ids, pairs[:, 0])
+    column_ids, columns = np.unique(pairs[found, 1], return_inverse=True)
+    return sparse.csr_matrix(
+        (
+            np.ones(len(columns), dtype=np.float32),
+            (rows[found], columns),
+        ),
+        shape=(len(recipe_ids), len(column_ids)),
+    )
+
+
+class RecipeFeatures:
+
+    def __init__(self):
+        self.recipe_ids = np.array(
+            Recipe.objects.order_by('id').values_list('id', flat=True),
+            dtype=np.int64,
+        )
+        ingredients = to_matrix(
+            list(IngredientRecipe.objects.values_list(
+                'recipe_id', 'ingredient_id'
+            )),
+            self.recipe_ids,
+        )
+        tags = to_matrix(
+            list(Recipe.tags.through.objects.values_list(
+                'recipe_id', 'tag_id'
+            )),
+            self.recipe_ids,
+        )
+        ingredients = ingredients.multiply(get_idf(ingredients)).tocsr()
+        tags = tags.multiply(
+            get_idf(tags) * SIMILAR_TAG_WEIGHT
+        ).toarray().astype(np.float32)
+        norms = np.sqrt(
+            np.asarray(ingredients.multiply(ingredients).sum(axis=1)).ravel()
+            + (tags * tags).sum(axis=1)
+        )
+        norms[norms == 0] = 1
+        self.ingredients = sparse.diags(1 / norms).dot(
+            ingredients
+        ).astype(np.float32).tocsr()
+        self.ingredients_transposed = self.ingredients.T.tocsr()
+        self.tags = (tags / norms[:, None]).astype(np.float32)
+        self.batch_size = max(
+            1, SIMILAR_BATCH_CELLS // max(1, len(self.recipe_ids))
+        )
+
+    def get_rows(self, recipe_ids):
+        rows, found = find_rows(
+            self.recipe_ids,
+            np.fromiter(recipe_ids, dtype=np.int64),
+        )
+        return np.sort(rows[found])
+
+    def get_scores(self, rows):
+        scores = self.ingredients[rows].dot(
+            self.ingredients_transposed
+        ).toarray()
+        np.add(
+            scores,
+            self.tags[rows].dot(self.tags.T),
+            out=scores,
+            where=scores > 0,
+        )
+        scores[np.arange(len(rows)), rows] = 0
+        return scores
+
+    def get_top(self, rows, limit):
+        limit = min(limit, len(self.recipe_ids) - 1)
+        if limit < 1 or not len(rows):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty.astype(np.float32)
+        scores = self.get_scores(rows)
+        columns = np.argpartition(scores, -limit, axis=1)[:, -limit:]
+        top = np.take_along_axis(scores, columns, axis=1)
+        order = np.argsort(-top, axis=1, kind='stable')
+        columns = np.take_along_axis(columns, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        found = top > 0
+        sources = np.broadcast_to(rows[:, None], found.shape)
+        return (
+            self.recipe_ids[sources[found]],
+            self.recipe_ids[columns[found]],
+            top[found],
+        )
@@ -0,0 +1,54 @@
+import gzip
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+from .constants import MEDIA_GZIP_MAX_RATIO, MEDIA_GZIP_SUFFIX
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, filename = os.path.split(name)
+        name = os.path.join(
+            directory,
+            digest.hexdigest() + os.path.splitext(filename)[1].lower(),
+        )
+        if self.exists(name):
+            return name
+        name = super().save(name, content, max_length)
+        data = b''.join(content.chunks())
+        compressed = gzip.compress(data, mtime=0)
+        if len(compressed) <= len(data) * MEDIA_GZIP_MAX_RATIO:
+            self._save(name + MEDIA_GZIP_SUFFIX, ContentFile(compressed))
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        super().delete(name + MEDIA_GZIP_SUFFIX)
+
+
+content_hash_storage = ContentHashStorage()
+
+
+@deconstructible
+class ExportStorage(FileSystemStorage):
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('location', settings.EXPORT_ROOT)
+        super().__init__(**kwargs)
+
+
+export_storage = ExportStorage()
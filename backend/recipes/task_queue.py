@@ -0,0 +1,119 @@
+import logging
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from backend.db_routers import read_from_primary
+from .constants import (
+    TASK_PRIORITY_DEFAULT,
+    TASK_STATUS_FAILED,
+    TASK_STATUS_QUEUED,
+    TASK_STATUS_RUNNING,
+)
+from .models import Task
+
+logger = logging.getLogger('recipes.tasks')
+
+
+def task(priority=TASK_PRIORITY_DEFAULT, max_attempts=None):
+    def decorator(function):
+        function.task_name = f'{function.__module__}.{function.__name__}'
+        function.task_priority = priority
+        function.task_max_attempts = max_attempts
+        function.enqueue = partial(enqueue, function)
+        return function
+    return decorator
+
+
+def call_on_primary(function, *args, **kwargs):
+    with read_from_primary():
+        return function(*args, **kwargs)
+
+
+def enqueue(function, *args, **kwargs):
+    def create():
+        if settings.TASKS_EAGER:
+            call_on_primary(function, *args, **kwargs)
+            return
+        Task.objects.create(
+            name=function.task_name,
+            args=list(args),
+            kwargs=kwargs,
+            priority=function.task_priority,
+            max_attempts=(
+                function.task_max_attempts or settings.TASK_MAX_ATTEMPTS
+            ),
+        )
+    transaction.on_commit(create)
+
+
+def get_task_function(name):
+    function = import_string(name)
+    if getattr(function, 'task_name', None) != name:
+        raise ImportError(f'{name} не является фоновой задачей.')
+    return function
+
+
+def claim_tasks(worker, limit):
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        for task in Task.objects.select_for_update(
+            skip_locked=True
+        ).exclude(
+            status=TASK_STATUS_FAILED
+        ).filter(
+            available_at__lte=now
+        ).order_by('-priority', 'available_at')[:limit]:
+            tasks = Task.objects.filter(id=task.id, attempts=task.attempts)
+            if task.attempts >= task.max_attempts:
+                tasks.update(
+                    status=TASK_STATUS_FAILED,
+                    error=task.error or 'Превышено время выполнения.',
+                )
+                continue
+            task.status = TASK_STATUS_RUNNING
+            task.attempts += 1
+            task.locked_by = worker
+            task.available_at = now + timedelta(
+                seconds=settings.TASK_VISIBILITY_TIMEOUT
+            )
+            if tasks.update(
+                status=task.status,
+                attempts=task.attempts,
+                locked_by=task.locked_by,
+                available_at=task.available_at,
+            ):
+                claimed.append(task)
+    return claimed
+
+
+def run_task(task):
+    tasks = Task.objects.filter(id=task.id, attempts=task.attempts)
+    try:
+        call_on_primary(
+            get_task_function(task.name), *task.args, **task.kwargs
+        )
+    except Exception as error:
+        logger.exception('Task %s (%s) failed', task.id, task.name)
+        if task.attempts < task.max_attempts:
+            tasks.update(
+                status=TASK_STATUS_QUEUED,
+                available_at=timezone.now() + timedelta(
+                    seconds=settings.TASK_RETRY_DELAY
+                    * 2 ** (task.attempts - 1)
+                ),
+                error=repr(error),
+            )
+        else:
+            tasks.update(status=TASK_STATUS_FAILED, error=repr(error))
+        return False
+    else:
+        tasks.delete()
+        return True
+    finally:
+        close_old_connections()
@@ -0,0 +1,361 @@
+import os
+from datetime import timedelta
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.paginator import EmptyPage
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from recipes.admin import EstimatedCountPaginator
+from recipes.constants import (
+    EXPORT_FOLDER,
+    EXPORT_KIND_SHOPPING_CART,
+    EXPORT_STATUS_DONE,
+    INGREDIENT_MATCH_ALL,
+    TASK_PRIORITY_HIGH,
+    TASK_STATUS_FAILED,
+    TASK_STATUS_QUEUED,
+    TASK_STATUS_RUNNING,
+)
+from recipes.ingredient_index import IngredientIndex
+from recipes.models import (
+    ExportJob,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    Tag,
+    Task,
+    User,
+)
+from recipes.storage import ExportStorage
+from recipes.task_queue import claim_tasks, run_task, task
+
+completed_tasks = []
+
+
+@task()
+def complete_task(value):
+    completed_tasks.append(value)
+
+
+@task(priority=TASK_PRIORITY_HIGH)
+def complete_urgent_task(value):
+    completed_tasks.append(value)
+
+
+@task(max_attempts=3)
+def fail_task():
+    raise ValueError('Ошибка задачи')
+
+
+@patch('recipes.admin.ADMIN_ESTIMATED_COUNT_MIN', 0)
+class EstimatedCountPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.bulk_create(
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(25)
+        )
+
+    def get_paginator(self, estimate):
+        paginator = EstimatedCountPaginator(Tag.objects.order_by('id'), 10)
+        paginator.get_estimated_count = lambda: estimate
+        return paginator
+
+    def test_count_is_estimate(self):
+        self.assertEqual(self.get_paginator(1000).count, 1000)
+
+    def test_low_estimate_keeps_last_page_reachable(self):
+        paginator = self.get_paginator(10)
+        page = paginator.page(3)
+        self.assertEqual(len(page.object_list), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 25)
+
+    def test_low_estimate_has_next_page(self):
+        paginator = self.get_paginator(10)
+        page = paginator.page(1)
+        self.assertEqual(len(page.object_list), 10)
+        self.assertTrue(page.has_next())
+
+    def test_high_estimate_stops_at_last_page(self):
+        paginator = self.get_paginator(1000)
+        page = paginator.page(3)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.num_pages, 3)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+
+class IngredientIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recipe = Recipe.objects.create(
+            author=User.objects.create_user(
+                username='author',
+                email='author@example.com',
+                password='password',
+            ),
+            name='Борщ',
+            text='Варить два часа.',
+            image='recipes/images/borsch.png',
+            cooking_time=90,
+        )
+        cls.beet, cls.cabbage = Ingredient.objects.bulk_create((
+            Ingredient(name='Свёкла', measurement_unit='г'),
+            Ingredient(name='Капуста', measurement_unit='г'),
+        ))
+        IngredientRecipe.objects.create(
+            recipe=cls.recipe, ingredient=cls.beet, amount=300
+        )
+
+    def setUp(self):
+        self.index = IngredientIndex()
+        patcher = patch('api.signals.ingredient_index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def match(self, *ingredients):
+        return list(self.index.match(
+            [ingredient.id for ingredient in ingredients],
+            INGREDIENT_MATCH_ALL,
+        ))
+
+    def test_saved_ingredient_updates_index(self):
+        self.assertEqual(self.match(self.cabbage), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientRecipe.objects.create(
+                recipe=self.recipe, ingredient=self.cabbage, amount=200
+            )
+        self.assertEqual(
+            self.match(self.beet, self.cabbage), [self.recipe.id]
+        )
+
+    def test_deleted_ingredient_updates_index(self):
+        self.assertEqual(self.match(self.beet), [self.recipe.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientRecipe.objects.filter(recipe=self.recipe).delete()
+        self.assertEqual(self.match(self.beet), [])
+
+    def test_deleted_recipe_leaves_index(self):
+        self.assertEqual(self.match(self.beet), [self.recipe.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertEqual(self.match(self.beet), [])
+
+    def test_other_process_sees_changes(self):
+        other = IngredientIndex()
+        self.assertEqual(list(other.match(
+            [self.cabbage.id], INGREDIENT_MATCH_ALL
+        )), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientRecipe.objects.create(
+                recipe=self.recipe, ingredient=self.cabbage, amount=200
+            )
+        self.assertEqual(list(other.match(
+            [self.cabbage.id], INGREDIENT_MATCH_ALL
+        )), [self.recipe.id])
+
+
+@override_settings(
+    TASKS_EAGER=False,
+    TASK_RETRY_DELAY=10,
+    TASK_VISIBILITY_TIMEOUT=300,
+)
+@patch('recipes.task_queue.close_old_connections')
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        completed_tasks.clear()
+
+    def enqueue(self, function, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            function.enqueue(*args)
+        return Task.objects.latest('id')
+
+    def expire(self, task):
+        Task.objects.filter(id=task.id).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def assertAvailableIn(self, task, seconds):
+        self.assertAlmostEqual(
+            (task.available_at - timezone.now()).total_seconds(),
+            seconds,
+            delta=5,
+        )
+
+    def test_enqueue_waits_for_commit(self, close_old_connections):
+        with self.captureOnCommitCallbacks() as callbacks:
+            complete_task.enqueue(1)
+            self.assertFalse(Task.objects.exists())
+        callbacks[0]()
+        queued = Task.objects.get()
+        self.assertEqual(queued.name, 'recipes.tests.complete_task')
+        self.assertEqual(queued.args, [1])
+        self.assertEqual(queued.status, TASK_STATUS_QUEUED)
+
+    def test_claim_orders_by_priority(self, close_old_connections):
+        self.enqueue(complete_task, 1)
+        urgent = self.enqueue(complete_urgent_task, 2)
+        claimed = claim_tasks('worker', 1)
+        self.assertEqual([claimed_task.id for claimed_task in claimed], [
+            urgent.id
+        ])
+        urgent.refresh_from_db()
+        self.assertEqual(urgent.status, TASK_STATUS_RUNNING)
+        self.assertEqual(urgent.attempts, 1)
+        self.assertEqual(urgent.locked_by, 'worker')
+        self.assertAvailableIn(urgent, 300)
+
+    def test_claimed_task_is_not_claimed_twice(self, close_old_connections):
+        self.enqueue(complete_task, 1)
+        self.assertEqual(len(claim_tasks('first', 10)), 1)
+        self.assertEqual(claim_tasks('second', 10), [])
+
+    def test_completed_task_is_deleted(self, close_old_connections):
+        self.enqueue(complete_task, 1)
+        self.assertTrue(run_task(claim_tasks('worker', 1)[0]))
+        self.assertEqual(completed_tasks, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_retries_with_backoff(self, close_old_connections):
+        failing = self.enqueue(fail_task)
+        for delay in (10, 20):
+            with self.assertLogs('recipes.tasks', 'ERROR'):
+                self.assertFalse(run_task(claim_tasks('worker', 1)[0]))
+            failing.refresh_from_db()
+            self.assertEqual(failing.status, TASK_STATUS_QUEUED)
+            self.assertIn('Ошибка задачи', failing.error)
+            self.assertAvailableIn(failing, delay)
+            self.assertEqual(claim_tasks('worker', 1), [])
+            self.expire(failing)
+
+    def test_task_fails_after_max_attempts(self, close_old_connections):
+        failing = self.enqueue(fail_task)
+        for _ in range(3):
+            with self.assertLogs('recipes.tasks', 'ERROR'):
+                self.assertFalse(run_task(claim_tasks('worker', 1)[0]))
+            self.expire(failing)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, TASK_STATUS_FAILED)
+        self.assertEqual(failing.attempts, 3)
+        self.assertEqual(claim_tasks('worker', 1), [])
+
+    def test_expired_task_is_reclaimed(self, close_old_connections):
+        queued = self.enqueue(complete_task, 1)
+        stale = claim_tasks('first', 1)[0]
+        self.expire(queued)
+        reclaimed = claim_tasks('second', 1)[0]
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertEqual(reclaimed.locked_by, 'second')
+        run_task(stale)
+        self.assertTrue(Task.objects.filter(id=queued.id).exists())
+        run_task(reclaimed)
+        self.assertFalse(Task.objects.filter(id=queued.id).exists())
+
+    def test_expired_last_attempt_fails(self, close_old_connections):
+        queued = self.enqueue(fail_task)
+        Task.objects.filter(id=queued.id).update(attempts=2)
+        claim_tasks('worker', 1)
+        self.expire(queued)
+        self.assertEqual(claim_tasks('worker', 1), [])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, TASK_STATUS_FAILED)
+        self.assertEqual(queued.error, 'Превышено время выполнения.')
+
+
+@override_settings(TASKS_EAGER=False)
+class RunWorkerTests(TransactionTestCase):
+
+    def setUp(self):
+        completed_tasks.clear()
+
+    def test_burst_runs_queue_and_exits(self):
+        for value in range(3):
+            complete_task.enqueue(value)
+        fail_task.enqueue()
+        stdout = StringIO()
+        with patch('signal.signal'), self.assertLogs('recipes.tasks'):
+            call_command(
+                'run_worker', '--burst', '--concurrency', '1',
+                stdout=stdout,
+            )
+        self.assertEqual(sorted(completed_tasks), [0, 1, 2])
+        self.assertIn('Выполнено задач: 3, с ошибкой: 1.', stdout.getvalue())
+        self.assertEqual(
+            list(Task.objects.values_list('status', flat=True)),
+            [TASK_STATUS_QUEUED],
+        )
+
+
+@override_settings(EXPORT_RETENTION_DAYS=7)
+class ExportRetentionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='password',
+        )
+
+    def setUp(self):
+        export_root = TemporaryDirectory()
+        self.addCleanup(export_root.cleanup)
+        self.storage = ExportStorage(location=export_root.name)
+        patcher = patch('recipes.exports.export_storage', self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_file(self, name, age_days):
+        name = self.storage.save(
+            f'{EXPORT_FOLDER}{name}.pdf', ContentFile(b'%PDF')
+        )
+        modified = (timezone.now() - timedelta(days=age_days)).timestamp()
+        os.utime(self.storage.path(name), (modified, modified))
+        return name
+
+    def create_job(self, file, age_days):
+        return ExportJob.objects.create(
+            user=self.user,
+            kind=EXPORT_KIND_SHOPPING_CART,
+            status=EXPORT_STATUS_DONE,
+            file=file,
+            created_at=timezone.now() - timedelta(days=age_days),
+        )
+
+    def test_expired_jobs_and_unused_files_are_deleted(self):
+        expired_file = self.create_file('expired', 10)
+        shared_file = self.create_file('shared', 10)
+        orphan_file = self.create_file('orphan', 10)
+        fresh_file = self.create_file('fresh', 1)
+        self.create_job(expired_file, 10)
+        self.create_job(shared_file, 10)
+        recent_job = self.create_job(shared_file, 1)
+        stdout = StringIO()
+        call_command('cleanup_exports', stdout=stdout)
+        self.assertIn('Удалено выгрузок: 2, файлов: 2.', stdout.getvalue())
+        self.assertEqual(list(ExportJob.objects.all()), [recent_job])
+        for name, exists in (
+            (expired_file, False),
+            (orphan_file, False),
+            (shared_file, True),
+            (fresh_file, True),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(self.storage.exists(name), exists)
+
+    def test_missing_export_folder(self):
+        self.create_job('', 10)
+        stdout = StringIO()
+        call_command('cleanup_exports', '--days', '30', stdout=stdout)
+        self.assertIn('Удалено выгрузок: 0, файлов: 0.', stdout.getvalue())
+        call_command('cleanup_exports', stdout=stdout)
+        self.assertIn('Удалено выгрузок: 1, файлов: 0.', stdout.getvalue())
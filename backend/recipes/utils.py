@@ -0,0 +1,273 @@
+import json
+import re
+from functools import lru_cache
+from threading import local
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import BooleanField, Count, FloatField, Q, Sum
+from django.db.models.expressions import RawSQL
+
+from .constants import (
+    FEED_BACKFILL_LIMIT,
+    FEED_BATCH_SIZE,
+    FEED_POPULAR_AUTHORS_CACHE_KEY,
+    RESPONSE_CACHE_VERSION_NAME,
+    SEARCH_CONFIG,
+    SEARCH_FTS_TABLE,
+    SEARCH_FTS_WEIGHTS,
+    SEARCH_TOKEN_PATTERN,
+    SHORT_LINK_ALPHABET,
+    SHORT_LINK_CACHE_SIZE,
+    SHORT_LINK_MAX_LENGTH,
+)
+from .models import (
+    CacheVersion,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    ShortLink,
+    StaleSimilarRecipe,
+    Subscribe,
+    TimelineEntry,
+)
+from .task_queue import task
+
+SHORT_LINK_BASE = len(SHORT_LINK_ALPHABET)
+SEARCH_TOKEN = re.compile(SEARCH_TOKEN_PATTERN)
+
+
+def encode_short_link_code(recipe_id):
+    code = ''
+    while True:
+        recipe_id, remainder = divmod(recipe_id, SHORT_LINK_BASE)
+        code = SHORT_LINK_ALPHABET[remainder] + code
+        if not recipe_id:
+            return code
+
+
+def decode_short_link_code(code):
+    if not code or len(code) > SHORT_LINK_MAX_LENGTH:
+        raise ValueError(f'Некорректный код короткой ссылки: {code}')
+    recipe_id = 0
+    for char in code:
+        recipe_id = recipe_id * SHORT_LINK_BASE + SHORT_LINK_ALPHABET.index(
+            char
+        )
+    return recipe_id
+
+
+short_link_lookup = local()
+
+
+@lru_cache(maxsize=SHORT_LINK_CACHE_SIZE)
+def find_recipe_id_by_code(code):
+    short_link_lookup.missed = True
+    recipe_id = ShortLink.objects.filter(
+        code=code
+    ).values_list('recipe_id', flat=True).first()
+    if recipe_id is None:
+        return decode_short_link_code(code)
+    return recipe_id
+
+
+def get_recipe_id_by_code(code):
+    if len(code) < SHORT_LINK_MAX_LENGTH:
+        return decode_short_link_code(code), None
+    short_link_lookup.missed = False
+    recipe_id = find_recipe_id_by_code(code)
+    return recipe_id, not short_link_lookup.missed
+
+
+async def aget_recipe_id_by_code(code):
+    if len(code) < SHORT_LINK_MAX_LENGTH:
+        return decode_short_link_code(code), None
+    return await sync_to_async(get_recipe_id_by_code)(code)
+
+
+def get_popular_author_ids():
+    author_ids = cache.get(FEED_POPULAR_AUTHORS_CACHE_KEY)
+    if author_ids is None:
+        author_ids = frozenset(
+            Subscribe.objects.values('subscribed_user').annotate(
+                followers=Count('id')
+            ).filter(
+                followers__gt=settings.FEED_FANOUT_MAX_FOLLOWERS
+            ).values_list('subscribed_user', flat=True)
+        )
+        cache.set(
+            FEED_POPULAR_AUTHORS_CACHE_KEY,
+            author_ids,
+            settings.FEED_POPULAR_AUTHORS_CACHE_TIMEOUT,
+        )
+    return author_ids
+
+
+@task()
+def fan_out_recipe(recipe_id):
+    recipe = Recipe.objects.filter(id=recipe_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if recipe is None or recipe.author_id in get_popular_author_ids():
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe.id,
+                pub_date=recipe.pub_date,
+            )
+            for user_id in Subscribe.objects.filter(
+                subscribed_user_id=recipe.author_id
+            ).values_list('user_id', flat=True).iterator()
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+@task()
+def backfill_timeline(user_id, author_id, limit=FEED_BACKFILL_LIMIT):
+    if author_id in get_popular_author_ids():
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                pub_date=pub_date,
+            )
+            for recipe_id, pub_date in Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-pub_date').values_list('id', 'pub_date')[:limit]
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def remove_from_timeline(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id,
+    ).delete()
+
+
+def get_feed_queryset(user):
+    popular_author_ids = list(Subscribe.objects.filter(
+        user=user,
+        subscribed_user_id__in=get_popular_author_ids(),
+    ).values_list('subscribed_user_id', flat=True))
+    if not popular_author_ids:
+        return Recipe.objects.filter(
+            timeline_entries__user=user
+        ).order_by(
+            '-timeline_entries__pub_date',
+            '-timeline_entries__recipe_id',
+        )
+    return Recipe.objects.filter(
+        Q(id__in=TimelineEntry.objects.filter(user=user).values('recipe'))
+        | Q(author_id__in=popular_author_ids)
+    ).order_by('-pub_date', '-id')
+
+
+def search_recipes(queryset, query):
+    table = Recipe._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        condition = f'{table}.search_vector @@ {tsquery}'
+        rank = f'ts_rank({table}.search_vector, {tsquery})'
+        params = (query,)
+    elif vendor == 'sqlite':
+        tokens = SEARCH_TOKEN.findall(query)
+        if not tokens:
+            return queryset.none()
+        weights = ', '.join(map(str, SEARCH_FTS_WEIGHTS))
+        condition = (
+            f'{table}.id IN (SELECT rowid FROM {SEARCH_FTS_TABLE} '
+            f'WHERE {SEARCH_FTS_TABLE} MATCH %s)'
+        )
+        rank = (
+            f'(SELECT -bm25({SEARCH_FTS_TABLE}, {weights}) '
+            f'FROM {SEARCH_FTS_TABLE} WHERE {SEARCH_FTS_TABLE} MATCH %s '
+            f'AND {SEARCH_FTS_TABLE}.rowid = {table}.id)'
+        )
+        params = (' '.join(f'"{token}"*' for token in tokens),)
+    else:
+        return queryset.filter(
+            Q(name__icontains=query)
+            | Q(text__icontains=query)
+            | Q(ingredients__name__icontains=query)
+        ).distinct()
+    return queryset.filter(
+        RawSQL(condition, params, output_field=BooleanField())
+    ).annotate(
+        search_rank=RawSQL(rank, params, output_field=FloatField())
+    ).order_by('-search_rank', *Recipe._meta.ordering)
+
+
+def filter_recipe_ids(queryset, recipe_ids):
+    if not recipe_ids:
+        return queryset.none()
+    table = Recipe._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return queryset.filter(RawSQL(
+            f'{table}.id = ANY(%s::bigint[])',
+            ('{%s}' % ','.join(map(str, recipe_ids)),),
+            output_field=BooleanField(),
+        ))
+    if vendor == 'sqlite':
+        return queryset.filter(RawSQL(
+            f'{table}.id IN (SELECT value FROM json_each(%s))',
+            (json.dumps(list(recipe_ids)),),
+            output_field=BooleanField(),
+        ))
+    return queryset.filter(id__in=list(recipe_ids))
+
+
+def mark_similar_recipes_stale(recipe_ids):
+    StaleSimilarRecipe.objects.bulk_create(
+        (StaleSimilarRecipe(recipe_id=recipe_id) for recipe_id in recipe_ids),
+        ignore_conflicts=True,
+    )
+
+
+def get_shopping_cart_ingredients(user):
+    return IngredientRecipe.objects.filter(
+        recipe__in=ShoppingCart.objects.filter(user=user).values('recipe')
+    ).values(
+        'ingredient__name',
+        'ingredient__measurement_unit'
+    ).annotate(
+        total_amount=Sum('amount')
+    ).order_by(
+        'ingredient__name'
+    )
+
+
+def get_cache_version(name):
+    return CacheVersion.objects.filter(name=name).values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+def increment_cache_version(name, step=1):
+    with transaction.atomic():
+        cache_version, _ = (
+            CacheVersion.objects.select_for_update().get_or_create(name=name)
+        )
+        cache_version.version += step
+        cache_version.save(update_fields=['version'])
+    return cache_version.version
+
+
+def get_response_cache_version():
+    return get_cache_version(RESPONSE_CACHE_VERSION_NAME)
+
+
+def invalidate_response_cache():
+    increment_cache_version(RESPONSE_CACHE_VERSION_NAME)
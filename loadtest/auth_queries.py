@@ -0,0 +1,64 @@
+import argparse
+import json
+import time
+from unittest.mock import patch
+
+from fixtures import get_reader_token, seed_recipes
+
+AUTHENTICATION_CLASSES = {
+    'token': 'rest_framework.authentication.TokenAuthentication',
+    'cached_token': 'api.authentication.CachedTokenAuthentication',
+}
+PATHS = ('/api/users/me/', '/api/recipes/?limit=1')
+
+
+def measure(path, authentication_class, token, requests):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.utils.module_loading import import_string
+    from rest_framework.views import APIView
+
+    cache.clear()
+    client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+    with override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        AUTH_TOKEN_CACHE_TIMEOUT=60,
+    ), patch.object(
+        APIView,
+        'authentication_classes',
+        [import_string(authentication_class)],
+    ):
+        client.get(path)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                client.get(path)
+            elapsed = time.perf_counter() - started
+    return {
+        'queries_per_request': round(len(queries) / requests, 2),
+        'ms_per_request': round(elapsed / requests * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Запросы к базе на аутентификацию по токену'
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    seed_recipes(1)
+    token = get_reader_token()
+    results = {
+        path: {
+            name: measure(path, authentication_class, token, args.requests)
+            for name, authentication_class in AUTHENTICATION_CLASSES.items()
+        }
+        for path in PATHS
+    }
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
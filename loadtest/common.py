@@ -0,0 +1,138 @@
+import http.client
+import json
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    count = len(latencies) + errors
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0,
+        'rps': round(count / elapsed, 1) if elapsed else 0,
+        'p50_ms': _to_ms(percentile(latencies, 50)),
+        'p95_ms': _to_ms(percentile(latencies, 95)),
+        'p99_ms': _to_ms(percentile(latencies, 99)),
+        'max_ms': _to_ms(max(latencies) if latencies else None),
+    }
+
+
+def _to_ms(seconds):
+    if seconds is None:
+        return None
+    return round(seconds * 1000, 2)
+
+
+class Connection:
+
+    def __init__(self, base_url, timeout=10):
+        url = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if url.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.connection = connection_class(
+            url.hostname,
+            url.port,
+            timeout=timeout
+        )
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None and not isinstance(body, (bytes, str)):
+            body = json.dumps(body)
+            headers.setdefault('Content-Type', 'application/json')
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+
+    def close(self):
+        self.connection.close()
+
+
+def run_load(base_url, next_request, concurrency, duration=None,
+             total_requests=None, is_error=None, expected_statuses=None):
+    is_error = is_error or (lambda status: status >= 400)
+    expected_statuses = expected_statuses or {}
+    lock = threading.Lock()
+    results = {}
+    issued = [0]
+    deadline = time.monotonic() + duration if duration else None
+
+    def should_continue():
+        if deadline and time.monotonic() >= deadline:
+            return False
+        if total_requests is None:
+            return True
+        with lock:
+            if issued[0] >= total_requests:
+                return False
+            issued[0] += 1
+            return True
+
+    def worker(worker_id):
+        connection = Connection(base_url)
+        latencies = {}
+        errors = {}
+        while should_continue():
+            name, method, path, body, headers = next_request(worker_id)
+            started = time.perf_counter()
+            try:
+                status, _ = connection.request(method, path, body, headers)
+                failed = (
+                    status not in expected_statuses[name]
+                    if name in expected_statuses else is_error(status)
+                )
+            except (http.client.HTTPException, OSError):
+                connection = Connection(base_url)
+                failed = True
+            latency = time.perf_counter() - started
+            if failed:
+                errors[name] = errors.get(name, 0) + 1
+            else:
+                latencies.setdefault(name, []).append(latency)
+        connection.close()
+        with lock:
+            for name, values in latencies.items():
+                results.setdefault(name, [[], 0])[0].extend(values)
+            for name, count in errors.items():
+                results.setdefault(name, [[], 0])[1] += count
+
+    threads = [
+        threading.Thread(target=worker, args=(worker_id,))
+        for worker_id in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    all_latencies = []
+    all_errors = 0
+    endpoints = {}
+    for name, (latencies, errors) in sorted(results.items()):
+        endpoints[name] = summarize(latencies, errors, elapsed)
+        all_latencies.extend(latencies)
+        all_errors += errors
+    return {
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 2),
+        'total': summarize(all_latencies, all_errors, elapsed),
+        'endpoints': endpoints,
+    }
@@ -0,0 +1,198 @@
+import argparse
+import itertools
+import json
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+from common import run_load
+from fixtures import BACKEND_DIR, get_reader_token, seed_recipes
+
+SERVER_MODES = {
+    'wsgi': {'SERVER_MODE': 'wsgi', 'GUNICORN_WORKER_CLASS': 'sync'},
+    'gthread': {'SERVER_MODE': 'wsgi', 'GUNICORN_WORKER_CLASS': 'gthread'},
+    'asgi': {'SERVER_MODE': 'asgi'},
+}
+
+
+def parse_numbers(value):
+    return [int(number) for number in value.split(',')]
+
+
+def read_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def get_children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            children.append(int(entry))
+    return children
+
+
+def total_rss_kb(pid):
+    return read_rss_kb(pid) + sum(
+        read_rss_kb(child) for child in get_children(pid)
+    )
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f'Сервер не запустился на порту {port}')
+
+
+def start_server(mode, workers, port, extra_env=None):
+    server = subprocess.Popen(
+        ['gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR,
+        env={
+            **os.environ,
+            **SERVER_MODES[mode],
+            'GUNICORN_BIND': f'127.0.0.1:{port}',
+            'GUNICORN_WORKERS': str(workers),
+            **(extra_env or {}),
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    time.sleep(1)
+    return server
+
+
+def measure(mode, workers, args, token, recipe_ids, extra_env=None):
+    server = start_server(mode, workers, args.port, extra_env)
+    base_url = f'http://127.0.0.1:{args.port}'
+    headers = {'Authorization': f'Token {token}'}
+    endpoints = itertools.cycle([
+        ('recipe_list', '/api/recipes/?limit=6'),
+        ('recipe_detail', None),
+        ('subscriptions', '/api/users/subscriptions/?recipes_limit=3'),
+        ('short_link_redirect', None),
+    ])
+    ids = itertools.cycle(recipe_ids.items())
+    lock = threading.Lock()
+
+    def next_request(worker_id):
+        with lock:
+            name, path = next(endpoints)
+            recipe_id, code = next(ids)
+        if name == 'recipe_detail':
+            path = f'/api/recipes/{recipe_id}/'
+        elif name == 'short_link_redirect':
+            path = f'/s/{code}/'
+        return name, 'GET', path, None, headers
+
+    results = []
+    idle_rss = total_rss_kb(server.pid)
+    try:
+        for concurrency in args.concurrency:
+            peak_rss = [idle_rss]
+            done = threading.Event()
+
+            def sample():
+                while not done.wait(0.2):
+                    peak_rss[0] = max(peak_rss[0], total_rss_kb(server.pid))
+
+            sampler = threading.Thread(target=sample)
+            sampler.start()
+            report = run_load(
+                base_url,
+                next_request,
+                concurrency=concurrency,
+                duration=args.duration,
+                is_error=lambda status: status >= 400,
+            )
+            done.set()
+            sampler.join()
+            results.append({
+                'mode': mode,
+                'workers': workers,
+                'concurrency': concurrency,
+                'rps': report['total']['rps'],
+                'p50_ms': report['total']['p50_ms'],
+                'p99_ms': report['total']['p99_ms'],
+                'error_rate': report['total']['error_rate'],
+                'idle_rss_mb': round(idle_rss / 1024, 1),
+                'peak_rss_mb': round(peak_rss[0] / 1024, 1),
+                'kb_per_connection': round(
+                    (peak_rss[0] - idle_rss) / concurrency, 1
+                ),
+            })
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+    return results
+
+
+def prepare_data(recipes):
+    seed_recipes(recipes)
+    token = get_reader_token()
+    from recipes.models import Recipe
+    from recipes.utils import encode_short_link_code
+    recipe_ids = {
+        recipe_id: encode_short_link_code(recipe_id)
+        for recipe_id in Recipe.objects.values_list('id', flat=True)
+    }
+    return token, recipe_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            'Сравнение пропускной способности и памяти '
+            'режимов gunicorn: sync, gthread и uvicorn (ASGI)'
+        )
+    )
+    parser.add_argument(
+        '--workers',
+        type=parse_numbers,
+        default=[os.cpu_count()],
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=parse_numbers,
+        default=[8, 32, 64],
+    )
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=7100)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument(
+        '--modes',
+        type=lambda value: value.split(','),
+        default=['wsgi', 'asgi'],
+    )
+    args = parser.parse_args()
+    token, recipe_ids = prepare_data(args.recipes)
+    results = []
+    for mode in args.modes:
+        for workers in args.workers:
+            results.extend(measure(mode, workers, args, token, recipe_ids))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import json
+
+from compare_servers import measure, parse_numbers, prepare_data
+
+VARIANTS = {
+    'new_connection_per_request': {'DB_CONN_MAX_AGE': '0'},
+    'persistent_connections': {'DB_CONN_MAX_AGE': '60'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            'Задержка запросов с новым соединением к базе на каждый запрос, '
+            'с постоянными соединениями и через pgbouncer'
+        )
+    )
+    parser.add_argument('--mode', default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument(
+        '--concurrency',
+        type=parse_numbers,
+        default=[1, 16],
+    )
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=7100)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument(
+        '--pgbouncer',
+        metavar='HOST:PORT',
+        help='Дополнительно замерить подключение через pgbouncer'
+    )
+    args = parser.parse_args()
+    variants = dict(VARIANTS)
+    if args.pgbouncer:
+        host, port = args.pgbouncer.split(':')
+        variants['pgbouncer'] = {
+            'DB_HOST': host,
+            'DB_PORT': port,
+            'DB_CONN_MAX_AGE': '0',
+            'DB_DISABLE_SERVER_SIDE_CURSORS': 'true',
+        }
+    token, recipe_ids = prepare_data(args.recipes)
+    results = []
+    for name, extra_env in variants.items():
+        for result in measure(
+            args.mode, args.workers, args, token, recipe_ids, extra_env
+        ):
+            result['variant'] = name
+            results.append(result)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+AUTHOR_EMAIL = 'loadtest@foodgram.local'
+READER_EMAIL = 'loadtest-reader@foodgram.local'
+
+
+def setup_django():
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+
+def seed_recipes(count):
+    setup_django()
+    from recipes.models import Recipe, User
+
+    author, _ = User.objects.get_or_create(
+        email=AUTHOR_EMAIL,
+        defaults={'username': 'loadtest'}
+    )
+    missing = count - Recipe.objects.count()
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=f'Рецепт {number}',
+            text='Нагрузочный тест',
+            image='recipes/images/loadtest.png',
+            cooking_time=1,
+        ) for number in range(max(missing, 0))
+    )
+    return author
+
+
+def get_reader_token():
+    setup_django()
+    from rest_framework.authtoken.models import Token
+
+    from recipes.models import Subscribe, User
+
+    author = User.objects.get(email=AUTHOR_EMAIL)
+    reader, _ = User.objects.get_or_create(
+        email=READER_EMAIL,
+        defaults={'username': 'loadtest-reader'}
+    )
+    Subscribe.objects.get_or_create(user=reader, subscribed_user=author)
+    token, _ = Token.objects.get_or_create(user=reader)
+    return token.key
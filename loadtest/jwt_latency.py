@@ -0,0 +1,70 @@
+import argparse
+import json
+
+from common import run_load
+from compare_servers import parse_numbers, start_server
+from fixtures import READER_EMAIL, get_reader_token, seed_recipes
+
+PATH = '/api/users/subscriptions/'
+
+
+def get_reader_jwt():
+    from api.serializers import UserClaimsTokenObtainPairSerializer
+    from recipes.models import User
+
+    user = User.objects.get(email=READER_EMAIL)
+    return str(
+        UserClaimsTokenObtainPairSerializer.get_token(user).access_token
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f'Задержка {PATH} с токеном DRF и с JWT'
+    )
+    parser.add_argument('--mode', default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument(
+        '--concurrency',
+        type=parse_numbers,
+        default=[1, 16],
+    )
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=7100)
+    args = parser.parse_args()
+    seed_recipes(1)
+    token_headers = {'Authorization': f'Token {get_reader_token()}'}
+    variants = (
+        ('token_uncached', {'AUTH_TOKEN_CACHE_TIMEOUT': '0'}, token_headers),
+        ('token_cached', {'AUTH_TOKEN_CACHE_TIMEOUT': '60'}, token_headers),
+        ('jwt', {}, {'Authorization': f'Bearer {get_reader_jwt()}'}),
+    )
+    results = []
+    for name, extra_env, auth_headers in variants:
+        server = start_server(
+            args.mode,
+            args.workers,
+            args.port,
+            {'JWT_AUTH': 'true', **extra_env},
+        )
+        try:
+            for concurrency in args.concurrency:
+                report = run_load(
+                    f'http://127.0.0.1:{args.port}',
+                    lambda worker_id: (name, 'GET', PATH, None, auth_headers),
+                    concurrency=concurrency,
+                    duration=args.duration,
+                )
+                results.append({
+                    'auth': name,
+                    'concurrency': concurrency,
+                    **report['total'],
+                })
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
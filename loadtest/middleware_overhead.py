@@ -0,0 +1,91 @@
+import argparse
+import json
+import time
+
+from fixtures import setup_django
+
+MIDDLEWARE_PROFILES = {
+    'full': [
+        'django.middleware.security.SecurityMiddleware',
+        'api.middleware.ShortLinkRedirectMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ],
+    'lean': [
+        'django.middleware.security.SecurityMiddleware',
+        'api.middleware.ShortLinkRedirectMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'api.middleware.AdminMiddleware',
+    ],
+}
+MIDDLEWARE_PROFILES['lean_timing'] = [
+    'api.middleware.RequestTimingMiddleware',
+    *MIDDLEWARE_PROFILES['lean'],
+]
+PATH = '/api/ping/'
+
+
+def ping(request):
+    from django.http import HttpResponse
+
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+def get_urlpatterns():
+    from django.urls import path
+
+    return [path(PATH.lstrip('/'), ping)]
+
+
+urlpatterns = []
+
+
+def measure(middleware, requests):
+    from django.core.handlers.base import BaseHandler
+    from django.test import RequestFactory, override_settings
+
+    factory = RequestFactory(HTTP_AUTHORIZATION='Token loadtest')
+    with override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        MIDDLEWARE=middleware,
+        REQUEST_TIMING_SAMPLE_RATE=0,
+        ROOT_URLCONF=__name__,
+    ):
+        handler = BaseHandler()
+        handler.load_middleware()
+        handler.get_response(factory.get(PATH))
+        started = time.perf_counter()
+        for _ in range(requests):
+            handler.get_response(factory.get(PATH))
+        elapsed = time.perf_counter() - started
+    return elapsed / requests * 1000000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Накладные расходы middleware на запрос к API'
+    )
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+    urlpatterns.extend(get_urlpatterns())
+    timings = {}
+    for _ in range(args.rounds):
+        for name, middleware in MIDDLEWARE_PROFILES.items():
+            elapsed = measure(middleware, args.requests)
+            timings[name] = min(timings.get(name, elapsed), elapsed)
+    results = {name: round(us, 1) for name, us in timings.items()}
+    results['saved_us'] = round(timings['full'] - timings['lean'], 1)
+    results['timing_us'] = round(
+        timings['lean_timing'] - timings['lean'], 1
+    )
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
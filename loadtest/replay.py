@@ -0,0 +1,299 @@
+import argparse
+import json
+import random
+import sys
+from urllib.parse import quote
+
+from common import Connection, run_load
+
+SYNTHETIC_MIX = {
+    'recipe_list': 30,
+    'recipe_list_filtered': 15,
+    'recipe_detail': 20,
+    'ingredient_autocomplete': 10,
+    'tag_list': 3,
+    'favorite_toggle': 6,
+    'shopping_cart_toggle': 5,
+    'download_shopping_cart': 2,
+    'subscription_list': 5,
+    'subscribe_toggle': 4,
+}
+TOGGLE_STATUSES = {
+    'POST': {201, 400},
+    'DELETE': {204, 400},
+}
+
+
+def parse_mix(value):
+    mix = dict(SYNTHETIC_MIX)
+    for item in filter(None, value.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in SYNTHETIC_MIX:
+            sys.exit(f'Неизвестный тип запроса: {name}')
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def login(base_url, email_template, password, count):
+    connection = Connection(base_url)
+    tokens = []
+    for number in range(count):
+        status, body = connection.request(
+            'POST',
+            '/api/auth/token/login/',
+            {'email': email_template.format(number), 'password': password},
+        )
+        if status != 200:
+            sys.exit(
+                f'Не удалось войти как {email_template.format(number)}: '
+                f'{status}. Заполните базу командой seed_foodgram.'
+            )
+        tokens.append(json.loads(body)['auth_token'])
+    connection.close()
+    return tokens
+
+
+def fetch_catalog(base_url, token, recipes):
+    connection = Connection(base_url)
+    headers = {'Authorization': f'Token {token}'}
+
+    def get(path):
+        status, body = connection.request('GET', path, headers=headers)
+        if status != 200:
+            sys.exit(f'GET {path} вернул {status}')
+        return json.loads(body)
+
+    recipe_list = get(f'/api/recipes/?limit={recipes}')['results']
+    if not recipe_list:
+        sys.exit('В базе нет рецептов. Заполните её командой seed_foodgram.')
+    catalog = {
+        'recipe_ids': [recipe['id'] for recipe in recipe_list],
+        'author_ids': sorted({
+            recipe['author']['id'] for recipe in recipe_list
+        }),
+        'tag_slugs': [tag['slug'] for tag in get('/api/tags/')],
+        'ingredient_names': [
+            ingredient['name'] for ingredient in get('/api/ingredients/')
+        ],
+    }
+    connection.close()
+    return catalog
+
+
+class SyntheticTraffic:
+
+    def __init__(self, mix, catalog, tokens, seed, concurrency):
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.catalog = catalog
+        self.tokens = tokens
+        self.rngs = [
+            random.Random(seed * concurrency + worker_id)
+            for worker_id in range(concurrency)
+        ]
+        self.pending = [{} for _ in range(concurrency)]
+
+    def headers(self, worker_id):
+        token = self.tokens[worker_id % len(self.tokens)]
+        return {'Authorization': f'Token {token}'}
+
+    def toggle(self, worker_id, name, ids, path):
+        pending = self.pending[worker_id]
+        if name in pending:
+            item_id = pending.pop(name)
+            return name, 'DELETE', path.format(item_id), None
+        item_id = self.rngs[worker_id].choice(ids)
+        pending[name] = item_id
+        return name, 'POST', path.format(item_id), None
+
+    def recipe_list(self, rng):
+        limit = rng.choice((6, 6, 6, 12))
+        return f'/api/recipes/?page={rng.randint(1, 5)}&limit={limit}'
+
+    def recipe_list_filtered(self, rng):
+        params = [f'limit={rng.choice((6, 12))}']
+        params.extend(
+            f'tags={slug}' for slug in rng.sample(
+                self.catalog['tag_slugs'],
+                min(rng.randint(1, 3), len(self.catalog['tag_slugs'])),
+            )
+        )
+        extra = rng.choice(('author', 'is_favorited', 'is_in_shopping_cart'))
+        if extra == 'author':
+            params.append(
+                f'author={rng.choice(self.catalog["author_ids"])}'
+            )
+        else:
+            params.append(f'{extra}=1')
+        return '/api/recipes/?' + '&'.join(params)
+
+    def __call__(self, worker_id):
+        rng = self.rngs[worker_id]
+        pending = self.pending[worker_id]
+        name = (
+            next(iter(pending)) if pending and rng.random() < 0.5
+            else rng.choices(self.names, self.weights)[0]
+        )
+        catalog = self.catalog
+        if name == 'favorite_toggle':
+            request = self.toggle(
+                worker_id, name, catalog['recipe_ids'],
+                '/api/recipes/{}/favorite/',
+            )
+        elif name == 'shopping_cart_toggle':
+            request = self.toggle(
+                worker_id, name, catalog['recipe_ids'],
+                '/api/recipes/{}/shopping_cart/',
+            )
+        elif name == 'subscribe_toggle':
+            request = self.toggle(
+                worker_id, name, catalog['author_ids'],
+                '/api/users/{}/subscribe/',
+            )
+        elif name == 'recipe_list':
+            request = name, 'GET', self.recipe_list(rng), None
+        elif name == 'recipe_list_filtered':
+            request = name, 'GET', self.recipe_list_filtered(rng), None
+        elif name == 'recipe_detail':
+            recipe_id = rng.choice(catalog['recipe_ids'])
+            request = name, 'GET', f'/api/recipes/{recipe_id}/', None
+        elif name == 'ingredient_autocomplete':
+            prefix = rng.choice(catalog['ingredient_names'])[
+                :rng.randint(1, 3)
+            ]
+            request = name, 'GET', f'/api/ingredients/?name={prefix}', None
+        elif name == 'tag_list':
+            request = name, 'GET', '/api/tags/', None
+        elif name == 'download_shopping_cart':
+            request = (
+                name, 'GET', '/api/recipes/download_shopping_cart/', None
+            )
+        else:
+            request = (
+                name,
+                'GET',
+                '/api/users/subscriptions/?limit=6&recipes_limit=3',
+                None,
+            )
+        name, method, path, body = request
+        if name.endswith('_toggle'):
+            name = f'{name}_{method.lower()}'
+        return name, method, quote_path(path), body, self.headers(worker_id)
+
+
+def quote_path(path):
+    return quote(path, safe='/?&=')
+
+
+class RecordedTraffic:
+
+    def __init__(self, path, tokens, concurrency):
+        with open(path, encoding='utf-8') as file:
+            self.requests = [
+                json.loads(line) for line in file if line.strip()
+            ]
+        if not self.requests:
+            sys.exit(f'Файл {path} не содержит запросов')
+        self.tokens = tokens
+        self.positions = [
+            worker_id * len(self.requests) // concurrency
+            for worker_id in range(concurrency)
+        ]
+
+    @property
+    def expected_statuses(self):
+        return {
+            request.get('name', request['path']): set(request['expect'])
+            for request in self.requests if 'expect' in request
+        }
+
+    def __call__(self, worker_id):
+        position = self.positions[worker_id]
+        self.positions[worker_id] = (position + 1) % len(self.requests)
+        request = self.requests[position]
+        headers = dict(request.get('headers', {}))
+        if request.get('auth', True) and self.tokens:
+            token = self.tokens[worker_id % len(self.tokens)]
+            headers.setdefault('Authorization', f'Token {token}')
+        return (
+            request.get('name', request['path']),
+            request.get('method', 'GET'),
+            quote_path(request['path']),
+            request.get('body'),
+            headers,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            'Воспроизводит записанный или синтетический поток запросов к API '
+            'и выводит задержки по каждому типу запроса'
+        )
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:7000')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--requests', type=int)
+    parser.add_argument(
+        '--traffic',
+        help='Файл JSON Lines с запросами, по умолчанию синтетический поток'
+    )
+    parser.add_argument(
+        '--mix',
+        default='',
+        help='Веса синтетического потока: recipe_detail=40,tag_list=0'
+    )
+    parser.add_argument('--users', type=int)
+    parser.add_argument(
+        '--email-template',
+        default='seed-user-{}@seed.foodgram.local',
+    )
+    parser.add_argument('--password', default='foodgram-seed')
+    parser.add_argument('--catalog-recipes', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    tokens = login(
+        args.url,
+        args.email_template,
+        args.password,
+        args.users or args.concurrency,
+    )
+    if args.traffic:
+        next_request = RecordedTraffic(args.traffic, tokens, args.concurrency)
+        expected_statuses = next_request.expected_statuses
+        mix = None
+    else:
+        mix = parse_mix(args.mix)
+        next_request = SyntheticTraffic(
+            mix,
+            fetch_catalog(args.url, tokens[0], args.catalog_recipes),
+            tokens,
+            args.seed,
+            args.concurrency,
+        )
+        expected_statuses = {
+            f'{name}_{method.lower()}': statuses
+            for name in mix if name.endswith('_toggle')
+            for method, statuses in TOGGLE_STATUSES.items()
+        }
+    report = run_load(
+        args.url,
+        next_request,
+        concurrency=args.concurrency,
+        duration=None if args.requests else args.duration,
+        total_requests=args.requests,
+        expected_statuses=expected_statuses,
+    )
+    report['traffic'] = args.traffic or 'synthetic'
+    report['mix'] = mix
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import itertools
+import json
+import sys
+
+from common import Connection, run_load
+from fixtures import seed_recipes
+
+
+def fetch_codes(base_url, count):
+    connection = Connection(base_url)
+    status, body = connection.request(
+        'GET', f'/api/recipes/?limit={count}'
+    )
+    if status != 200:
+        sys.exit(f'Не удалось получить список рецептов: {status}')
+    codes = []
+    for recipe in json.loads(body)['results']:
+        status, body = connection.request(
+            'GET', f'/api/recipes/{recipe["id"]}/get-link/'
+        )
+        codes.append(json.loads(body)['short-link'].rsplit('/', 1)[-1])
+    connection.close()
+    if not codes:
+        sys.exit('В базе нет рецептов, запустите скрипт с --seed')
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный тест редиректа коротких ссылок /s/<code>/'
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:7000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument(
+        '--seed',
+        action='store_true',
+        help='Создать недостающие рецепты через Django ORM перед тестом'
+    )
+    args = parser.parse_args()
+    if args.seed:
+        seed_recipes(args.recipes)
+    codes = fetch_codes(args.url, args.recipes)
+    code_cycles = [
+        itertools.cycle(codes[worker_id:] + codes[:worker_id])
+        for worker_id in range(args.concurrency)
+    ]
+
+    def next_request(worker_id):
+        code = next(code_cycles[worker_id])
+        return 'short_link_redirect', 'GET', f'/s/{code}/', None, {}
+
+    report = run_load(
+        args.url,
+        next_request,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        is_error=lambda status: status != 302,
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()